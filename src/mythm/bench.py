@@ -0,0 +1,189 @@
+"""Renderer micro-benchmarks on synthetic charts, headless (SDL dummy driver).
+
+Each case renders `frames` frames of one renderer with a given number of
+notes on screen, hold ratio, pressed lanes and live hit flashes (each
+with an FX particle burst), and reports frames per second, direct
+`pygame.Surface()` constructions and text-cache renders per call, and the
+peak Python memory one call allocates (tracemalloc). Surfaces made in C
+(copy, convert, transform, font.render outside the text cache) are not
+counted. Results can be saved as a baseline; later runs are compared
+against it, so a renderer regression shows up as a number.
+"""
+import json
+import os
+import platform
+import random
+import time
+import tracemalloc
+
+import pygame
+
+from mythm.config import W, H, SPAWN_TIME
+from mythm.fx import FX
+from mythm.notes import Chart, NoteWindow
+from mythm.profiler import CountingSurface
+from mythm.textcache import TEXT
+from mythm.renderers import (
+    HitFlash, lane_layout_default, lr6_layout, render_lr6_beatup_ui, render_multilane,
+)
+
+BASELINE_PATH = "bench-baseline.json"
+
+# one-factor-at-a-time sweeps around the default case
+DEFAULT_CASE = {"visible": 200, "holds": 0.25, "pressed": 0, "flashes": 0}
+SWEEPS = {
+    "visible": (100, 500, 2000),
+    "holds": (0.0, 0.75),
+    "pressed": (3, 6),
+    "flashes": (8, 32),
+}
+T0 = 10_000        # song ms of the first benchmark frame
+FRAME_MS = 1000 / 60
+
+
+def synthetic_chart(visible, hold_ratio, frames, lanes=6, seed=1):
+    """About `visible` notes on screen at any time over the benchmark span."""
+    rnd = random.Random(seed)
+    span = SPAWN_TIME * 1.25              # LR6 on-screen head range
+    step = span / visible
+    t, end = T0 - SPAWN_TIME, T0 + frames * FRAME_MS + SPAWN_TIME
+    notes = []
+    while t < end:
+        hold = rnd.random() < hold_ratio
+        notes.append({"tMs": int(t), "lane": rnd.randrange(lanes),
+                      "type": "hold" if hold else "tap",
+                      "durMs": rnd.choice((150, 400, 1000)) if hold else 0})
+        t += step
+    return Chart.from_notes(notes)
+
+
+def cases():
+    out = [("default", dict(DEFAULT_CASE))]
+    for key, values in SWEEPS.items():
+        for v in values:
+            c = dict(DEFAULT_CASE)
+            c[key] = v
+            out.append((f"{key}={v}", c))
+    return out
+
+
+def _measure(draw, frames):
+    """(fps, Surface() ctors/call, text renders/call, kb/call) for draw(frame_index)."""
+    for k in range(5):            # warm caches (layers, sprites, atlases)
+        draw(k)
+
+    t0 = time.perf_counter()
+    for k in range(frames):
+        draw(k)
+    fps = frames / max(1e-9, time.perf_counter() - t0)
+
+    orig = pygame.Surface
+    pygame.Surface = CountingSurface
+    base, text_base = CountingSurface.created, TEXT.misses
+    try:
+        n = min(frames, 30)
+        peak_sum = 0
+        tracemalloc.start()
+        for k in range(n):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            draw(k)
+            peak_sum += tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+    finally:
+        pygame.Surface = orig
+    return (round(fps, 1), round((CountingSurface.created - base) / n, 2),
+            round((TEXT.misses - text_base) / n, 2), round(peak_sum / 1024 / n, 2))
+
+
+def run(frames=200):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # read at display init
+    pygame.init()
+    screen = pygame.display.set_mode((W, H))
+    font = pygame.font.SysFont("Arial", 22)
+    layout = lr6_layout(screen.get_size())
+    lane_w, x0 = lane_layout_default(6)
+
+    results = {}
+    for name, c in cases():
+        chart = synthetic_chart(c["visible"], c["holds"], frames)
+        window = NoteWindow(chart)
+        window.spawn(1 << 30)
+        flash = HitFlash()
+        clock = [T0]
+        fx = FX(clock=lambda: clock[0], seed=1)  # runs on bench time, not ticks
+
+        def now_of(k):
+            clock[0] = T0 + k * FRAME_MS
+            return clock[0]
+
+        def key_state(now):
+            return [now + 1000 if lane < c["pressed"] else 0 for lane in range(6)]
+
+        def keep_flashes(now):
+            # top the pool up so `flashes` are always live
+            if c["flashes"] and int(now / FRAME_MS) % 10 == 0:
+                for j in range(c["flashes"]):
+                    hx, hy = layout.targets[j % 6]
+                    flash.add(hx, hy, now, (160, 220, 255), dur=180)
+                    fx.burst(hx, hy, (160, 220, 255))
+
+        def lr6(k):
+            now = now_of(k)
+            keep_flashes(now)
+            render_lr6_beatup_ui(screen, window, now, key_state(now), font, flash)
+
+        def lane(k):
+            now = now_of(k)
+            render_multilane(screen, window, now, 6, lane_w, x0, "KEY", key_state(now), font)
+
+        def flashes(k):
+            now = now_of(k)
+            keep_flashes(now)
+            flash.draw(screen, now)
+
+        def particles(k):
+            keep_flashes(now_of(k))
+            fx.draw(screen)
+
+        results[f"lr6/{name}"] = _measure(lr6, frames)
+        if c["flashes"]:   # the lane renderer draws no flashes
+            results[f"flash/{name}"] = _measure(flashes, frames)
+            results[f"fx/{name}"] = _measure(particles, frames)
+        else:
+            results[f"lane/{name}"] = _measure(lane, frames)
+    pygame.quit()
+    return {k: {"fps": v[0], "surface_ctors_per_call": v[1], "text_renders_per_call": v[2], "kb_per_call": v[3]}
+            for k, v in results.items()}
+
+
+def main(frames=200, baseline=BASELINE_PATH, save=False, tolerance=0.15):
+    res = run(frames)
+    base = {}
+    if baseline and os.path.exists(baseline) and not save:
+        with open(baseline, encoding="utf-8") as f:
+            base = json.load(f).get("results", {})
+
+    regressions = []
+    print(f"{'case':<24} {'fps':>9} {'Surface()':>10} {'text':>6} {'KB/call':>9}  vs baseline")
+    for name, r in res.items():
+        line = (f"{name:<24} {r['fps']:>9.1f} {r['surface_ctors_per_call']:>10.2f}"
+                f" {r['text_renders_per_call']:>6.2f} {r['kb_per_call']:>9.2f}")
+        b = base.get(name)
+        if b:
+            ratio = r["fps"] / b["fps"] if b["fps"] else 1.0
+            line += f"  {ratio * 100 - 100:+6.1f}% fps"
+            more_allocs = any(r[k] > b.get(k, r[k]) for k in ("surface_ctors_per_call", "text_renders_per_call"))
+            if ratio < 1 - tolerance or more_allocs:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if save and baseline:
+        with open(baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": platform.node(), "python": platform.python_version(),
+                       "frames": frames, "results": res}, f, indent=2)
+        print("Saved baseline:", baseline)
+    if regressions:
+        raise SystemExit(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+    return res
@@ -0,0 +1,193 @@
+"""Latency calibration: tap along to a metronome, estimate the offset.
+
+The metronome is rendered to an in-memory WAV and played through
+`pygame.mixer.music`, the same path songs use, so the measured offset
+includes the audio output latency as well as input latency. Each tap is
+judged against the nearest beat with `judge.judge`; the returned `d` goes
+into `OffsetEstimator`. The result is stored per machine (hostname) in
+`settings.json` and subtracted from game time in `runtime.song_now_ms`.
+"""
+import io
+import json
+import math
+import os
+import socket
+import struct
+import wave
+from collections import deque
+
+from mythm.config import W, H
+from mythm.judge import judge
+from mythm.textcache import render_text
+
+SETTINGS_PATH = "settings.json"
+
+BPM = 100
+BEATS = 40
+LEAD_MS = 1500          # silence before the first click
+SR = 44100
+CLICK_MS = 30
+MIN_TAPS = 12           # before an estimate is offered
+GOOD_CI_MS = 4.0        # 95% confidence half-width considered settled
+
+
+# ---------------- per-machine settings ----------------
+def _machine():
+    return socket.gethostname() or "default"
+
+
+def _load_settings(path=SETTINGS_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def machine_latency_ms(path=SETTINGS_PATH):
+    """Calibrated audio+input latency for this machine (0 if never calibrated)."""
+    m = _load_settings(path).get("machines", {}).get(_machine(), {})
+    return int(m.get("latencyMs", 0))
+
+
+def save_machine_latency(latency_ms, path=SETTINGS_PATH):
+    data = _load_settings(path)
+    data.setdefault("machines", {}).setdefault(_machine(), {})["latencyMs"] = int(round(latency_ms))
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+# ---------------- estimator ----------------
+class OffsetEstimator:
+    """Robust running estimate of the mean tap error over the last `window` taps.
+
+    Reports the median and a trimmed mean (the `trim` fraction is cut from
+    each end), with a 95% confidence half-width from the MAD, so a few
+    wild taps neither move the estimate nor fake a tight confidence.
+    """
+
+    def __init__(self, window=64, trim=0.2, max_abs_ms=250):
+        self.samples = deque(maxlen=window)
+        self.trim = trim
+        self.max_abs_ms = max_abs_ms
+        self.rejected = 0
+
+    def add(self, d):
+        if abs(d) > self.max_abs_ms:
+            self.rejected += 1
+            return False
+        self.samples.append(float(d))
+        return True
+
+    def estimate(self):
+        """(trimmed_mean_ms, median_ms, ci95_ms, n); None if no samples."""
+        n = len(self.samples)
+        if n == 0:
+            return None
+        s = sorted(self.samples)
+        median = (s[(n - 1) // 2] + s[n // 2]) / 2
+        k = int(n * self.trim)
+        core = s[k:n - k] or s
+        mean = sum(core) / len(core)
+        mad = sorted(abs(x - median) for x in s)[n // 2]
+        ci = 1.96 * 1.4826 * mad / math.sqrt(n) if n > 1 else float("inf")
+        return mean, median, ci, n
+
+    def settled(self):
+        est = self.estimate()
+        return est is not None and est[3] >= MIN_TAPS and est[2] <= GOOD_CI_MS
+
+
+# ---------------- metronome ----------------
+def metronome_wav(bpm=BPM, beats=BEATS, lead_ms=LEAD_MS, sr=SR):
+    """16-bit stereo WAV bytes: `beats` clicks, the first at lead_ms."""
+    period = 60000.0 / bpm
+    total = int((lead_ms + period * beats) * sr / 1000)
+    pcm = bytearray(total * 4)
+    click_n = int(CLICK_MS * sr / 1000)
+    for b in range(beats):
+        freq = 1760.0 if b % 4 == 0 else 1320.0
+        start = int((lead_ms + b * period) * sr / 1000)
+        for i in range(min(click_n, total - start)):
+            env = 1.0 - i / click_n
+            v = int(20000 * env * env * math.sin(2 * math.pi * freq * i / sr))
+            struct.pack_into("<hh", pcm, (start + i) * 4, v, v)
+    out = io.BytesIO()
+    with wave.open(out, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(bytes(pcm))
+    out.seek(0)
+    return out
+
+
+class Calibration:
+    """State of one calibration run; the runtime feeds it taps in song ms."""
+
+    def __init__(self, bpm=BPM, beats=BEATS, lead_ms=LEAD_MS):
+        self.period = 60000.0 / bpm
+        self.beats = beats
+        self.lead_ms = lead_ms
+        self._wav = None
+        self.reset()
+
+    def reset(self):
+        self.est = OffsetEstimator()
+        self.last = None  # (res, d) of the latest tap
+
+    def audio(self):
+        if self._wav is None:
+            self._wav = metronome_wav(60000.0 / self.period, self.beats, self.lead_ms).getvalue()
+        return io.BytesIO(self._wav)
+
+    def end_ms(self):
+        return self.lead_ms + self.period * self.beats
+
+    def tap(self, t_ms):
+        """Judge a tap (raw song ms, no offsets applied) against the nearest beat."""
+        k = round((t_ms - self.lead_ms) / self.period)
+        if k < 0 or k >= self.beats:
+            return None
+        res, d = judge(t_ms, self.lead_ms + k * self.period)
+        self.est.add(d)
+        self.last = (res, d)
+        return self.last
+
+    def result(self):
+        """Latency to store, or None while there are too few taps."""
+        est = self.est.estimate()
+        if est is None or est[3] < MIN_TAPS:
+            return None
+        return est[0]
+
+    def draw(self, screen, font, big, now):
+        """Draw the screen; returns the rects drawn (for dirty-rect mode)."""
+        rects = []
+        rects.append(screen.blit(render_text(big, "CALIBRATION", (255, 255, 255)), (20, 18)))
+        rects.append(screen.blit(render_text(font, "Tap SPACE (or any lane key) on each click | ENTER save | BACKSPACE cancel",
+                                             (200, 200, 210)), (20, 52)))
+        # beat counter only; no flash on the beat so taps follow the audio
+        beat = int((now - self.lead_ms) // self.period) + 1
+        beat_txt = f"beat {max(0, min(beat, self.beats))}/{self.beats}"
+        rects.append(screen.blit(render_text(font, beat_txt, (180, 180, 255)), (20, 86)))
+
+        est = self.est.estimate()
+        if est is None:
+            msg, col = "waiting for taps...", (220, 220, 230)
+        else:
+            mean, median, ci, n = est
+            col = (120, 255, 160) if self.est.settled() else (255, 220, 160)
+            msg = f"latency {mean:+.1f} ms (median {median:+.1f}, ±{ci:.1f}) from {n} taps"
+        s = render_text(big, msg, col)
+        rects.append(screen.blit(s, (W // 2 - s.get_width() // 2, H // 2 - 20)))
+        if self.last is not None:
+            res, d = self.last
+            s = render_text(font, f"last tap: {res} {d:+.0f} ms", (200, 200, 210))
+            rects.append(screen.blit(s, (W // 2 - s.get_width() // 2, H // 2 + 26)))
+        if self.est.rejected:
+            s = render_text(font, f"ignored {self.est.rejected} stray taps", (160, 160, 170))
+            rects.append(screen.blit(s, (W // 2 - s.get_width() // 2, H // 2 + 54)))
+        return rects
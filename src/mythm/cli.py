@@ -1,20 +1,49 @@
-from mythm.tools import bpm, chart, make_chart
+from mythm.tools import bpm, chart, make_chart, preview
 import typer
-from mythm import runtime
+from mythm import bench, runtime, replay, scoring
+from mythm.pacing import PACING_MODES
+from enum import Enum
 from pathlib import Path
 from typing import Annotated
 
 app = typer.Typer()
 
+Pacing = Enum("Pacing", {m: m for m in PACING_MODES}, type=str)
+
+
+@app.command()
+def play(input_hz: Annotated[int, typer.Option(help="Poll input at this rate between frames with --pacing cap (0 = once per frame)")] = 0,
+         profile_log: Annotated[Path | None, typer.Option(help="Write per-frame phase timings to this CSV file")] = None,
+         pacing: Annotated[Pacing, typer.Option(help="Frame pacing")] = Pacing.cap,
+         fps: Annotated[int, typer.Option(help="Frame rate for --pacing cap; also the frame budget for dropped-frame stats")] = 60,
+         dirty_rects: Annotated[bool, typer.Option(help="Repaint and present only changed screen regions")] = False):
+    runtime.main(input_hz=input_hz, profile_log=profile_log, pacing=pacing.value, fps=fps, dirty_rects=dirty_rects)
+
+@app.command('replay')
+def replay_cmd(path: Path, render: Annotated[bool, typer.Option(help="Draw every frame and report frame times")] = False,
+               frame_ms: Annotated[float, typer.Option(help="Simulated frame length")] = 1000/60):
+    replay.main(path, render=render, frame_ms=frame_ms)
 
 @app.command()
-def play():
-    runtime.main()
+def rescore(paths: list[Path],
+            windows: Annotated[list[str] | None, typer.Option(help="Extra judge window set to compare, as s_perfect,perfect,great,miss_at (ms); repeatable")] = None):
+    scoring.main(paths, windows or ())
+
+@app.command('bench')
+def bench_cmd(frames: Annotated[int, typer.Option(help="Frames rendered per case")] = 200,
+              baseline: Annotated[Path, typer.Option(help="Baseline JSON to compare against (or write)")] = Path(bench.BASELINE_PATH),
+              save_baseline: Annotated[bool, typer.Option(help="Store this run as the baseline")] = False,
+              tolerance: Annotated[float, typer.Option(help="FPS drop vs baseline reported as a regression")] = 0.15):
+    bench.main(frames=frames, baseline=str(baseline), save=save_baseline, tolerance=tolerance)
 
 @app.command('chart')
 def gen_chart(song_dir: Annotated[Path, typer.Option()] = Path('songs'), artist: Annotated[str | None, typer.Option()] = None):
     make_chart.main(song_dir)
 
+@app.command('preview')
+def gen_preview(song_dir: Annotated[Path, typer.Option()] = Path('songs')):
+    preview.main(song_dir)
+
 @app.command()
 def update_bpm(song_dir: Annotated[Path, typer.Option()] = Path('songs'), artist: Annotated[str | None, typer.Option()] = None):
     bpm.main(song_dir)
@@ -1,6 +1,7 @@
 W, H = 980, 620
 JUDGE_Y = 520
 SPAWN_TIME = 2600
+BG = (20, 20, 30)
 
 COUNTDOWN_MS = 3000
 GO_MS = 450
@@ -13,10 +14,5 @@ MISS_AT   = 140
 
 KEY_HOLD_MS = 120
 
-# LR6 group layout
-LR6_GAP_PX = 90          # ช่องว่างกลางระหว่างซ้าย-ขวา
-LR6_LANE_W = 105         # ความกว้าง lane ใน LR6
-LR6_LANE_PAD = 8         # ช่องว่างเล็กๆ ใน lane
-
 BASE_R = 18          # เดิมประมาณ 12 → เพิ่มเป็น 18
 NEAR_SCALE = 1.2     # โตขึ้นตอนใกล้เส้น
\ No newline at end of file
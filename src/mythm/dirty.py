@@ -0,0 +1,60 @@
+"""Dirty-rectangle presentation.
+
+Instead of clearing and flipping the whole window every frame, each frame
+repaints the background only under what was drawn last frame, records
+the rects of what it draws now, and presents the union of both with
+`pygame.display.update(rects)`. Everything dynamic is still drawn every
+frame; only the clear and the copy to the display shrink. A change of
+background (screen switch, layout change) falls back to one full frame.
+"""
+import pygame
+
+
+class DirtyRects:
+    def __init__(self, size, full_ratio=0.6):
+        self.size = size
+        self.full_area = size[0] * size[1] * full_ratio  # above this, just flip
+        self.prev = []
+        self.cur = []
+        self.full = True
+        self._bg = None
+
+    def invalidate(self):
+        """Redraw and present the whole window next frame."""
+        self.full = True
+
+    def restore(self, screen, background):
+        """Start a frame: repaint `background` (Surface or colour tuple) under last frame's rects."""
+        if background is not self._bg and background != self._bg:
+            self._bg = background
+            self.full = True
+        is_colour = isinstance(background, tuple)
+        if self.full:
+            if is_colour:
+                screen.fill(background)
+            else:
+                screen.blit(background, (0, 0))
+            return
+        for r in self.prev:
+            if is_colour:
+                screen.fill(background, r)
+            else:
+                screen.blit(background, r, r)
+
+    def add(self, rect):
+        if rect is not None and rect.w > 0 and rect.h > 0:
+            self.cur.append(rect)
+        return rect
+
+    def extend(self, rects):
+        for r in rects:
+            self.add(r)
+
+    def present(self):
+        """Show this frame: the union of last and this frame's rects (or everything)."""
+        rects = self.prev + self.cur
+        if self.full or sum(r.w * r.h for r in rects) > self.full_area:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+        self.prev, self.cur, self.full = self.cur, [], False
@@ -0,0 +1,208 @@
+"""Headless gameplay: spawn, judgement, holds and combo without pygame.
+
+`runtime.main` drives a GameSession from the real mixer clock and keyboard;
+tools drive it from a SimClock and recorded or generated inputs.
+"""
+from mythm.config import SPAWN_TIME, MISS_AT
+from mythm.judge import judge
+from mythm.notes import Chart, LaneIndex, NoteWindow, HOLD
+
+# a hold may be released this close to its end
+HOLD_RELEASE_GRACE_MS = 30
+
+# session event kinds: (kind, lane, t_ms, result, d)
+EV_HIT = "HIT"
+EV_MISS = "MISS"
+EV_HOLD_START = "HOLD_START"
+EV_HOLD_DONE = "HOLD_DONE"
+
+# runtime screen states
+STATE_SELECT = "SELECT"
+STATE_COUNTDOWN = "COUNTDOWN"
+STATE_PLAYING = "PLAYING"
+STATE_PAUSE_CD = "PAUSE_CD"
+STATE_CALIBRATE = "CALIBRATE"
+
+
+def forwards_lane_key(state, down):
+    """Whether a lane key press (down) or release in `state` reaches the session.
+
+    Presses are judged only while playing. Releases also count during the
+    resume countdown, or a hold let go while paused would complete as PERFECT.
+    """
+    if down:
+        return state == STATE_PLAYING
+    return state in (STATE_PLAYING, STATE_PAUSE_CD)
+
+
+class SimClock:
+    """Manually advanced clock for offline runs."""
+
+    def __init__(self, now_ms=0.0):
+        self.now_ms = float(now_ms)
+
+    def now(self):
+        return self.now_ms
+
+    def advance(self, ms):
+        self.now_ms += ms
+        return self.now_ms
+
+
+class GameSession:
+    """One play-through of a chart.
+
+    Call `spawn(now)` at the top of a frame, `press`/`release` for each lane
+    input at its own timestamp, then `update(now)` for auto-miss and hold
+    completion. Everything that happened is appended to `events` for the
+    caller (FX, sound, replays) to consume and clear.
+    """
+
+    def __init__(self, chart=None, clock=None):
+        self.clock = clock
+        self.window = NoteWindow()
+        self.lane_idx = LaneIndex()
+        self.events = []
+        self.reset(chart if chart is not None else Chart())
+
+    def reset(self, chart=None):
+        if chart is not None:
+            self.chart = chart
+        self.chart.reset()
+        self.window.reset(self.chart)
+        self.lane_idx.reset(self.chart)
+        self.holding = [None]*6  # lane -> chart index or None
+        c = self.chart
+        self.last_ms = max((t + d for t, d in zip(c.t_ms, c.dur_ms)), default=0)
+        self.combo = 0
+        self.max_combo = 0
+        self.counts = {}
+        self.events.clear()
+
+    # ---------------- per-frame ----------------
+    def spawn(self, now):
+        for i in self.window.spawn(now + SPAWN_TIME):
+            self.lane_idx.push(i)
+
+    def update(self, now):
+        self.auto_miss(now)
+        self.update_holds(now)
+
+    def auto_miss(self, now):
+        """Miss taps and hold starts that went past MISS_AT."""
+        for i in self.lane_idx.expire(now):
+            self.window.judge(i)
+            self._miss(self.chart.lane[i], now)
+
+    def update_holds(self, now):
+        """Complete finished holds (early release is judged in release())."""
+        for lane, hi in enumerate(self.holding):
+            if hi is not None and now >= self.chart.end_ms(hi):
+                self.window.judge(hi)
+                self.holding[lane] = None
+                self._count("PERFECT", lane, now, EV_HOLD_DONE)
+
+    def step(self, now=None, inputs=()):
+        """One full frame; `inputs` is an iterable of (t_ms, lane, down)."""
+        if now is None:
+            now = self.clock.now()
+        self.spawn(now)
+        for t_ms, lane, down in inputs:
+            if down:
+                self.press(lane, t_ms)
+            else:
+                self.release(lane, t_ms)
+        self.update(now)
+
+    # ---------------- input ----------------
+    def press(self, lane, now):
+        # already holding -> ignore new start
+        if self.holding[lane] is not None:
+            return
+        i = self.lane_idx.candidate(lane, now)
+        if i is None:
+            self._miss(lane, now)
+            return
+
+        res, d = judge(now, self.chart.t_ms[i])
+        if res in ("S.PERFECT", "PERFECT", "GREAT"):
+            if self.chart.kind[i] == HOLD:
+                # start holding; do not score until end
+                self.chart.set_hold_started(i)
+                self.holding[lane] = i
+                self.events.append((EV_HOLD_START, lane, now, res, d))
+            else:
+                self.window.judge(i)
+                self._count(res, lane, now, EV_HIT, d)
+        elif res == "MISS":
+            self.window.judge(i)
+            self._miss(lane, now, d)
+
+    def release(self, lane, now):
+        hi = self.holding[lane]
+        if hi is not None and now < self.chart.end_ms(hi) - HOLD_RELEASE_GRACE_MS:
+            self.window.judge(hi)
+            self.holding[lane] = None
+            self._miss(lane, now)
+
+    # ---------------- bookkeeping ----------------
+    def _count(self, res, lane, now, kind, d=0):
+        self.combo += 1
+        self.max_combo = max(self.max_combo, self.combo)
+        self.counts[res] = self.counts.get(res, 0) + 1
+        self.events.append((kind, lane, now, res, d))
+
+    def _miss(self, lane, now, d=None):
+        self.combo = 0
+        self.counts["MISS"] = self.counts.get("MISS", 0) + 1
+        self.events.append((EV_MISS, lane, now, "MISS", d))
+
+    def finished(self, now):
+        """True once every note is judged or past its miss window."""
+        return now > self.last_ms + MISS_AT and all(h is None for h in self.holding)
+
+    def run(self, inputs, frame_ms=1000/60, keep_events=False):
+        """Play a time-sorted stream of (t_ms, lane, down) inputs to the end.
+
+        Inputs are judged at their own timestamps; frames only decide when
+        spawn/auto-miss/hold checks run, as they do in the game loop.
+        """
+        clock = self.clock if self.clock is not None else SimClock()
+        inputs = list(inputs)
+        k = 0
+        log = []
+        now = clock.now()
+        while True:
+            batch_end = k
+            while batch_end < len(inputs) and inputs[batch_end][0] <= now:
+                batch_end += 1
+            self.step(now, inputs[k:batch_end])
+            k = batch_end
+            if keep_events:
+                log.extend(self.events)
+            self.events.clear()
+            if k >= len(inputs) and self.finished(now):
+                break
+            now = clock.advance(frame_ms)
+        return log
+
+    def summary(self):
+        return {
+            "notes": len(self.chart),
+            "combo": self.combo,
+            "max_combo": self.max_combo,
+            "counts": dict(self.counts),
+        }
+
+
+def autoplay_inputs(chart, offset_ms=0):
+    """Perfectly timed (t_ms, lane, down) inputs for every note of a chart."""
+    out = []
+    for i in range(len(chart)):
+        t = chart.t_ms[i] + offset_ms
+        lane = chart.lane[i]
+        up = t + chart.dur_ms[i] if chart.kind[i] == HOLD else t + 1
+        out.append((t, lane, True))
+        out.append((up, lane, False))
+    out.sort(key=lambda x: (x[0], x[2]))  # releases before presses at equal t
+    return out
@@ -1,7 +1,22 @@
+"""Screen effects: centre text, camera shake and hit particles.
+
+Particles live in a fixed pool of NumPy arrays (origin, velocity, birth
+time, lifetime, colour); when the pool is full the oldest are
+overwritten. A particle's position is a closed-form function of its age,
+so one vectorised pass per frame moves and culls the whole pool. All
+effects run on the time they are given, or on the injected `clock` when
+a call passes none: song ms in the game, so they freeze with pause, and
+a fake clock in headless benchmarks.
+"""
+import numpy as np
 import pygame
 
+GRAVITY = 0.0012   # px/ms^2
+PARTICLE_R = 4     # starting half-size in px, shrinks to 1
+
+
 class FX:
-    
+
     @property
     def center_text(self):
         return self.center
@@ -9,47 +24,92 @@ class FX:
     @center_text.setter
     def center_text(self, value):
         self.center = value
-        
-    def __init__(self):
+
+    def __init__(self, capacity=512, clock=pygame.time.get_ticks, seed=None):
+        self.clock = clock         # () -> ms, for calls without a time
+        self.capacity = capacity
+        self._origin = np.zeros((capacity, 2), np.float32)
+        self._vel = np.zeros((capacity, 2), np.float32)   # px/ms
+        self._born = np.zeros(capacity)
+        self._life = np.zeros(capacity)                   # 0 = free slot
+        self._col = np.zeros((capacity, 3), np.uint8)
+        self._next = 0
+        self._rng = np.random.default_rng(seed)
         self.center = None         # (text, col, start_now_ms, dur_ms)
-        self.bursts = []           # (x,y,col,start_now_ms,dur_ms)
-        self.shake_until = 0       # pygame ticks
+        self.shake_until = 0       # same time base as the clock
         self.amp = 0
 
+    def _now(self, now_ms):
+        return self.clock() if now_ms is None else now_ms
+
     def reset(self):
         self.center = None
-        self.bursts.clear()
+        self._life[:] = 0
         self.shake_until = 0
         self.amp = 0
 
-    def show(self, text, col, now_ms, dur=420):
-        self.center = (text, col, now_ms, dur)
+    def show(self, text, col, now_ms=None, dur=420):
+        self.center = (text, col, self._now(now_ms), dur)
 
-    def burst(self, x, y, col, now_ms, dur=260):
-        self.bursts.append((x, y, col, now_ms, dur))
+    def burst(self, x, y, col, now_ms=None, dur=260, n=12, speed=0.35):
+        """Spray `n` particles from (x, y) for `dur` ms."""
+        n = min(n, self.capacity)
+        idx = (self._next + np.arange(n)) % self.capacity
+        self._next = (self._next + n) % self.capacity
+        ang = self._rng.uniform(0, 2*np.pi, n)
+        spd = self._rng.uniform(0.4, 1.0, n) * speed
+        self._origin[idx] = (x, y)
+        self._vel[idx, 0] = np.cos(ang) * spd
+        self._vel[idx, 1] = np.sin(ang) * spd - speed  # kick upwards
+        self._born[idx] = self._now(now_ms)
+        self._life[idx] = dur
+        self._col[idx] = col
 
-    def shake(self, dur=210, amp=6):
-        t = pygame.time.get_ticks()
+    def particles(self, now_ms=None):
+        """Slots, positions and half-sizes of live particles; frees expired ones."""
+        age = self._now(now_ms) - self._born
+        live = self._life > 0
+        self._life[live & (age >= self._life)] = 0
+        idx = np.flatnonzero(self._life > 0)
+        a = np.maximum(age[idx], 0)[:, None]
+        xy = self._origin[idx] + self._vel[idx] * a
+        xy[:, 1] += 0.5 * GRAVITY * a[:, 0] ** 2
+        r = np.maximum(1, np.ceil(PARTICLE_R * (1 - a[:, 0] / self._life[idx])))
+        return idx, xy, r
+
+    def draw(self, screen, now_ms=None, dirty=None):
+        idx, xy, r = self.particles(now_ms)
+        if not len(idx):
+            return
+        left = (xy[:, 0] - r).astype(int).tolist()
+        top = (xy[:, 1] - r).astype(int).tolist()
+        size = (2 * r).astype(int).tolist()
+        fill = screen.fill
+        for col, x, y, s in zip(self._col[idx].tolist(), left, top, size):
+            rect = fill(col, (x, y, s, s))
+            if dirty is not None:
+                dirty.add(rect)
+
+    def shake(self, dur=210, amp=6, now_ms=None):
+        t = self._now(now_ms)
         self.shake_until = max(self.shake_until, t + dur)
         self.amp = max(self.amp, amp)
 
     def cam(self, now_ms=None):
-        t = pygame.time.get_ticks()
+        t = int(self._now(now_ms))
         if t >= self.shake_until or self.amp <= 0:
             return 0, 0
         span = self.amp * 2
         ox = (t % span) - self.amp
         oy = ((t // 2) % span) - self.amp
         return ox, oy
-    
-        # --- compatibility aliases for newer runtime ---
 
-    def show_center(self, text, col, now_ms, dur=420):
+    # --- compatibility aliases for newer runtime ---
+
+    def show_center(self, text, col, now_ms=None, dur=420):
         # runtime calls show_center; internal name is show()
         return self.show(text, col, now_ms, dur)
 
     def shake_miss(self, now_ms=None, dur=210, amp=6):
         # runtime calls shake_miss; internal name is shake()
-        return self.shake(dur=dur, amp=amp)
-
-
+        return self.shake(dur=dur, amp=amp, now_ms=now_ms)
@@ -0,0 +1,180 @@
+"""On-disk song library index (SQLite) with incremental rescans.
+
+The index lives in the user cache dir (one file per songs dir, so writing
+it never touches the mtimes it tracks) and holds one row per song folder:
+display title/artist, BPM, offset, the chart variants present, and the
+mtimes they were read at. A rescan stats every known artist dir, only
+lists directories whose mtime changed and only re-reads a meta.json whose
+own mtime changed, so an unchanged library costs a few stats per song and
+no directory listings or JSON parsing.
+"""
+import hashlib
+import json
+import os
+import sys
+import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import closing
+
+SONGS_DIR = "songs"
+
+SongEntry = namedtuple("SongEntry", "artist song title song_artist bpm offset_ms charts")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path  TEXT PRIMARY KEY,
+    mtime INTEGER
+);
+CREATE TABLE IF NOT EXISTS songs (
+    artist      TEXT NOT NULL,
+    song        TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    song_artist TEXT NOT NULL,
+    bpm         INTEGER NOT NULL,
+    offset_ms   INTEGER NOT NULL,
+    charts      TEXT NOT NULL,
+    meta_mtime  INTEGER,
+    charts_mtime INTEGER,
+    PRIMARY KEY (artist, song)
+);
+"""
+
+
+def _mtime(p):
+    try:
+        return os.stat(p).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _subdirs(p):
+    return sorted(d for d in os.listdir(p) if os.path.isdir(os.path.join(p, d)))
+
+
+def _cache_dir():
+    if sys.platform == "win32":
+        root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, "mythm")
+
+
+def default_index_path(base):
+    """Index file in the user cache dir, named after the songs dir's absolute path."""
+    key = hashlib.sha1(os.path.abspath(base).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(_cache_dir(), f"library-{key}.sqlite")
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class Library:
+    def __init__(self, base=SONGS_DIR, index_path=None):
+        self.base = base
+        self.index_path = index_path or default_index_path(base)
+        self.changed = threading.Event()  # set when a background rescan altered the index
+        self._scan_lock = threading.Lock()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        db = sqlite3.connect(self.index_path)
+        db.executescript(_SCHEMA)
+        return db
+
+    # ---------------- read ----------------
+    def songs(self):
+        """All indexed songs ordered by folder (artist, song)."""
+        if not os.path.isdir(self.base):
+            return []
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT artist, song, title, song_artist, bpm, offset_ms, charts"
+                " FROM songs ORDER BY artist, song"
+            ).fetchall()
+        return [SongEntry(*r[:6], tuple(c for c in r[6].split(",") if c)) for r in rows]
+
+    # ---------------- scan ----------------
+    def rescan(self):
+        """Bring the index up to date; returns True if anything changed."""
+        if not os.path.isdir(self.base):
+            return False
+        with self._scan_lock, closing(self._connect()) as db, db:
+            dirs = dict(db.execute("SELECT path, mtime FROM dirs"))
+            known = {}
+            for a, s in db.execute("SELECT artist, song FROM songs"):
+                known.setdefault(a, set()).add(s)
+            changed = False
+
+            def dir_changed(p):
+                mt = _mtime(p)
+                if dirs.get(p) == mt:
+                    return False
+                db.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?)", (p, mt))
+                return True
+
+            # artist dirs seen before, including ones that had no songs yet
+            seen = set(known) | {os.path.basename(p) for p in dirs if os.path.dirname(p) == self.base}
+            if dir_changed(self.base):
+                artists = _subdirs(self.base)
+                for gone in seen - set(artists):
+                    gp = os.path.join(self.base, gone)
+                    db.execute("DELETE FROM songs WHERE artist = ?", (gone,))
+                    db.execute("DELETE FROM dirs WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+                               (gp, _like_escape(gp + os.sep) + "%"))
+                    changed = True
+            else:
+                artists = sorted(seen)
+
+            for a in artists:
+                ap = os.path.join(self.base, a)
+                if dir_changed(ap):
+                    songs = _subdirs(ap) if os.path.isdir(ap) else []
+                    for gone in known.get(a, set()) - set(songs):
+                        db.execute("DELETE FROM songs WHERE artist = ? AND song = ?", (a, gone))
+                        changed = True
+                else:
+                    songs = sorted(known.get(a, ()))
+                for s in songs:
+                    changed |= self._scan_song(db, a, s)
+        if changed:
+            self.changed.set()
+        return changed
+
+    def _scan_song(self, db, a, s):
+        sp = os.path.join(self.base, a, s)
+        meta_p = os.path.join(sp, "meta.json")
+        charts_p = os.path.join(sp, "charts")
+        meta_mt, charts_mt = _mtime(meta_p), _mtime(charts_p)
+        row = db.execute(
+            "SELECT meta_mtime, charts_mtime FROM songs WHERE artist = ? AND song = ?", (a, s)
+        ).fetchone()
+        if row is not None and row == (meta_mt, charts_mt):
+            return False
+
+        meta = {}
+        if meta_mt is not None:
+            try:
+                meta = json.load(open(meta_p, encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print("Bad meta.json:", meta_p, "|", repr(e))
+        charts = []
+        if charts_mt is not None:
+            charts = sorted(f[:-5] for f in os.listdir(charts_p) if f.endswith(".json"))
+        db.execute(
+            "INSERT OR REPLACE INTO songs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (a, s, str(meta.get("title", s)), str(meta.get("artist", a)),
+             int(meta.get("bpm", 0) or 0), int(meta.get("offsetMs", 0) or 0),
+             ",".join(charts), meta_mt, charts_mt),
+        )
+        return True
+
+    def rescan_async(self):
+        """Rescan on a background thread; watch `changed` for the result."""
+        def work():
+            try:
+                self.rescan()
+            except (OSError, sqlite3.Error) as e:
+                print("Library rescan failed:", repr(e))
+        threading.Thread(target=work, name="library-rescan", daemon=True).start()
@@ -0,0 +1,162 @@
+"""Background song loading for the select screen.
+
+Switching songs used to parse the meta/chart and open the audio on the
+main thread. `SongLoader` does that on one worker thread: only the newest
+request is kept (older ones are dropped or abandoned between steps), and
+once it is done the song's other chart variants and the neighbouring
+songs' charts and preview audio are prefetched, so toggles and the next
+left/right press are instant. Only files up to `max_audio_file` bytes
+(preview clips, not full-length WAVs) are held in memory.
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from mythm.notes import Chart
+from mythm.songs import ChartCache, LANE_VARIANTS, DIFFS
+
+
+class SongLoad:
+    """Result of one request, picked up by the main thread via poll()."""
+
+    __slots__ = ("gen", "artist", "song", "meta", "chart", "err", "preview")
+
+    def __init__(self, gen, artist, song):
+        self.gen, self.artist, self.song = gen, artist, song
+        self.meta, self.chart, self.err, self.preview = None, None, None, None
+
+
+def read_song(charts, artist, song, lanes, diff):
+    """(meta, chart, err) from the cache; a bad file becomes `err`, not a raise."""
+    err = None
+    try:
+        meta = charts.meta(artist, song)
+    except (OSError, ValueError) as e:
+        meta, err = {}, f"Bad meta: {e!r}"
+    try:
+        chart, chart_err = charts.chart(artist, song, lanes, diff)
+    except (OSError, ValueError, KeyError) as e:
+        chart, chart_err = Chart(), f"Bad chart: {e!r}"
+    return meta, chart, err or chart_err
+
+
+class SongLoader:
+    def __init__(self, charts: ChartCache, preview_path, audio_budget=32 << 20, max_audio_file=4 << 20):
+        self.charts = charts
+        self.preview_path = preview_path  # (artist, song) -> audio file path
+        self.audio_budget = audio_budget
+        self.max_audio_file = max_audio_file  # larger files are streamed from disk
+        self._audio = OrderedDict()  # path -> (mtime, bytes)
+        self._audio_bytes = 0
+        self._audio_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._gen = 0
+        self._pending = None
+        self._done = None
+        threading.Thread(target=self._run, name="song-loader", daemon=True).start()
+
+    # ---------------- main thread ----------------
+    def request(self, artist, song, lanes, diff, neighbours=()):
+        """Load (artist, song) next; replaces any request not yet finished."""
+        with self._cond:
+            self._gen += 1
+            self._pending = (self._gen, artist, song, lanes, diff, tuple(neighbours))
+            self._done = None
+            self._cond.notify()
+            return self._gen
+
+    def cancel(self):
+        """Drop pending work and any unclaimed result."""
+        with self._cond:
+            self._gen += 1
+            self._pending = None
+            self._done = None
+
+    def poll(self):
+        """The finished result of the latest request, once."""
+        with self._cond:
+            res, self._done = self._done, None
+        return res
+
+    def audio_source(self, path):
+        """In-memory file for `path` if prefetched, else the path itself."""
+        with self._audio_lock:
+            ent = self._audio.get(path)
+            if ent is not None:
+                self._audio.move_to_end(path)
+                return io.BytesIO(ent[1])
+        return path
+
+    # ---------------- worker ----------------
+    def _stale(self, gen):
+        return gen != self._gen
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                job, self._pending = self._pending, None
+            try:
+                self._load(*job)
+            except Exception as e:
+                print("Song load failed:", job[1], job[2], "|", repr(e))
+
+    def _load(self, gen, artist, song, lanes, diff, neighbours):
+        res = SongLoad(gen, artist, song)
+        res.meta, res.chart, res.err = read_song(self.charts, artist, song, lanes, diff)
+        if self._stale(gen):
+            return
+        res.preview = self._read_audio(self.preview_path(artist, song))
+        with self._cond:
+            if self._stale(gen):
+                return
+            self._done = res
+
+        # warm the other variants (F3/F4/SHIFT+1-3), then the neighbours,
+        # while the player looks at this one
+        for other_lanes in LANE_VARIANTS:
+            for other_diff in DIFFS:
+                if self._stale(gen):
+                    return
+                try:
+                    self.charts.chart(artist, song, other_lanes, other_diff)
+                except (OSError, ValueError, KeyError):
+                    pass
+        for a, s in neighbours:
+            if self._stale(gen):
+                return
+            try:
+                self.charts.meta(a, s)
+                self.charts.chart(a, s, lanes, diff)
+                self._read_audio(self.preview_path(a, s))
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def _read_audio(self, path):
+        """Cache a small file's bytes (LRU within audio_budget); returns the path."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        mt = st.st_mtime_ns
+        if st.st_size > self.max_audio_file:
+            return path
+        with self._audio_lock:
+            ent = self._audio.get(path)
+            if ent is not None and ent[0] == mt:
+                self._audio.move_to_end(path)
+                return path
+        with open(path, "rb") as f:
+            data = f.read()
+        with self._audio_lock:
+            old = self._audio.pop(path, None)
+            if old is not None:
+                self._audio_bytes -= len(old[1])
+            self._audio[path] = (mt, data)
+            self._audio_bytes += len(data)
+            while self._audio_bytes > self.audio_budget:
+                _, (_, dropped) = self._audio.popitem(last=False)
+                self._audio_bytes -= len(dropped)
+        return path
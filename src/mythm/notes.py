@@ -0,0 +1,234 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+from mythm.config import GREAT, MISS_AT
+
+# note type codes
+TAP = 0
+HOLD = 1
+TYPE_CODES = {"tap": TAP, "hold": HOLD}
+TYPE_NAMES = {TAP: "tap", HOLD: "hold"}
+
+# per-note runtime flags
+HIT = 1
+HOLD_STARTED = 2
+
+DEFAULT_HOLD_MS = 500
+
+
+class Chart:
+    """Chart notes stored column-wise, sorted by tMs.
+
+    Columns are plain `array`s so per-note access stays a cheap index and
+    loading a chart does not allocate a dict per note. Runtime state
+    (hit / hold started) lives in `flags`, so a retry is just `reset()`.
+    """
+
+    __slots__ = ("t_ms", "lane", "kind", "dur_ms", "flags")
+
+    def __init__(self):
+        self.t_ms = array("i")
+        self.lane = array("b")
+        self.kind = array("b")
+        self.dur_ms = array("i")
+        self.flags = bytearray()
+
+    @classmethod
+    def from_notes(cls, notes):
+        """Build from chart JSON note dicts (any order)."""
+        c = cls()
+        for n in sorted(notes, key=lambda n: n["tMs"]):
+            kind = TYPE_CODES.get(n.get("type", "tap"), TAP)
+            c.t_ms.append(int(n["tMs"]))
+            c.lane.append(max(0, min(5, int(n.get("lane", 0)))))
+            c.kind.append(kind)
+            c.dur_ms.append(int(n.get("durMs", DEFAULT_HOLD_MS)) if kind == HOLD else 0)
+        c.flags = bytearray(len(c.t_ms))
+        return c
+
+    def __len__(self):
+        return len(self.t_ms)
+
+    def reset(self):
+        """Clear runtime flags so the chart can be played again."""
+        self.flags[:] = bytes(len(self.t_ms))
+
+    def is_hit(self, i):
+        return self.flags[i] & HIT
+
+    def set_hit(self, i):
+        self.flags[i] |= HIT
+
+    def hold_started(self, i):
+        return self.flags[i] & HOLD_STARTED
+
+    def set_hold_started(self, i):
+        self.flags[i] |= HOLD_STARTED
+
+    def end_ms(self, i):
+        return self.t_ms[i] + self.dur_ms[i]
+
+    def __getitem__(self, i):
+        return NoteView(self, i)
+
+    def __iter__(self):
+        for i in range(len(self.t_ms)):
+            yield NoteView(self, i)
+
+
+class NoteView:
+    """Read-only view of one chart row, with the old dict-style field names."""
+
+    __slots__ = ("chart", "i")
+
+    def __init__(self, chart, i):
+        self.chart = chart
+        self.i = i
+
+    @property
+    def tMs(self):
+        return self.chart.t_ms[self.i]
+
+    @property
+    def lane(self):
+        return self.chart.lane[self.i]
+
+    @property
+    def type(self):
+        return TYPE_NAMES[self.chart.kind[self.i]]
+
+    @property
+    def durMs(self):
+        return self.chart.dur_ms[self.i]
+
+    @property
+    def hit(self):
+        return bool(self.chart.is_hit(self.i))
+
+    @property
+    def hold_started(self):
+        return bool(self.chart.hold_started(self.i))
+
+    def to_dict(self):
+        d = {"tMs": self.tMs, "lane": self.lane, "type": self.type}
+        if self.chart.kind[self.i] == HOLD:
+            d["durMs"] = self.durMs
+        return d
+
+    def __repr__(self):
+        return f"NoteView({self.i}, {self.to_dict()})"
+
+
+class NoteWindow:
+    """Spawned notes for the renderers.
+
+    Spawned notes are the chart range [0, tail); judged notes are only
+    flagged HIT in the chart. `visible()` bisects the sorted note times,
+    plus hold heads alone for holds that started before the range, so
+    drawing cost follows on-screen density rather than how many notes are
+    spawned or how long the longest hold is.
+    """
+
+    def __init__(self, chart=None):
+        self.reset(chart if chart is not None else Chart())
+
+    def reset(self, chart=None):
+        if chart is not None:
+            self.chart = chart
+        self.tail = 0
+        # hold heads on their own: a hold whose body reaches a range starts at
+        # most max_hold_ms before it, and only holds are scanned for that
+        c = self.chart
+        self.hold_idx = array("i", (i for i in range(len(c)) if c.kind[i] == HOLD))
+        self.hold_t = array("i", (c.t_ms[i] for i in self.hold_idx))
+        self.max_hold_ms = max((c.dur_ms[i] for i in self.hold_idx), default=0)
+
+    def spawn(self, until_ms):
+        """Spawn every note with tMs <= until_ms; return the new indices."""
+        start, t_ms, n = self.tail, self.chart.t_ms, len(self.chart)
+        end = start
+        while end < n and t_ms[end] <= until_ms:
+            end += 1
+        self.tail = end
+        return range(start, end)
+
+    def judge(self, i):
+        """Mark note i hit so it is no longer drawn."""
+        self.chart.set_hit(i)
+
+    def visible(self, t_lo, t_hi, holds=True):
+        """Spawned, unhit notes with their head in [t_lo, t_hi].
+
+        With holds=True a hold also counts while any part of it (head to
+        end) overlaps the range, so a body spanning the screen is kept.
+        """
+        chart = self.chart
+        t_ms, flags = chart.t_ms, chart.flags
+        stop = min(bisect_right(t_ms, t_hi), self.tail)
+        if not holds:
+            for i in range(bisect_left(t_ms, t_lo), stop):
+                if not flags[i] & HIT:
+                    yield i
+            return
+        # holds with the head before t_lo and the body still in range
+        dur, hold_idx, hold_t, tail = chart.dur_ms, self.hold_idx, self.hold_t, self.tail
+        for k in range(bisect_left(hold_t, t_lo - self.max_hold_ms), bisect_left(hold_t, t_lo)):
+            i = hold_idx[k]
+            if i < tail and not flags[i] & HIT and t_ms[i] + dur[i] >= t_lo:
+                yield i
+        for i in range(bisect_left(t_ms, t_lo), stop):
+            if not flags[i] & HIT:
+                yield i
+
+
+class LaneIndex:
+    """Unhit note indices per lane, oldest first.
+
+    Notes are pushed in spawn order (chart order = tMs order), so every lane
+    queue stays sorted and only its head ever needs to be inspected.
+    """
+
+    def __init__(self, chart=None, lanes=6):
+        self.chart = chart
+        self.lanes = [deque() for _ in range(lanes)]
+
+    def reset(self, chart=None):
+        if chart is not None:
+            self.chart = chart
+        for q in self.lanes:
+            q.clear()
+
+    def push(self, i):
+        self.lanes[self.chart.lane[i]].append(i)
+
+    def candidate(self, lane, now):
+        """Closest unhit note within GREAT of `now` (earliest wins a tie)."""
+        q = self.lanes[lane]
+        t_ms, flags = self.chart.t_ms, self.chart.flags
+        while q and flags[q[0]] & HIT:
+            q.popleft()
+        best, best_d = None, float("inf")
+        for i in q:
+            d = now - t_ms[i]
+            if d < -GREAT:
+                break
+            if flags[i] & HIT or abs(d) > GREAT:
+                continue
+            if abs(d) < best_d:
+                best, best_d = i, abs(d)
+        return best
+
+    def expire(self, now):
+        """Pop notes older than MISS_AT; yield the ones that were never hit.
+
+        Hold notes that were started are owned by the hold tracker and are
+        dropped silently.
+        """
+        t_ms, flags = self.chart.t_ms, self.chart.flags
+        for q in self.lanes:
+            while q and now - t_ms[q[0]] > MISS_AT:
+                i = q.popleft()
+                if flags[i] & (HIT | HOLD_STARTED):
+                    continue
+                yield i
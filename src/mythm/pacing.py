@@ -0,0 +1,89 @@
+"""Frame pacing for the game loop.
+
+Modes:
+    cap       fixed rate (any fps); sleep until ~2 ms before the deadline,
+              then spin, which lands frames far closer than Clock.tick()
+    vsync     present on the display's refresh via set_mode(vsync=1);
+              falls back to `cap` if the driver refuses
+    uncapped  no waiting at all
+
+Input is polled between frames (InputPoller.poll_hz) only under `cap`;
+the other modes poll once per frame.
+
+Note and highlight positions are computed from song time, so any rate
+is correct; faster pacing only lowers visual latency.
+"""
+import time
+
+import pygame
+
+PACING_MODES = ("cap", "vsync", "uncapped")
+
+
+class FramePacer:
+    def __init__(self, mode="cap", fps=60, poller=None, spin_ms=2.0):
+        if mode not in PACING_MODES:
+            raise ValueError(f"pacing must be one of {PACING_MODES}, got {mode!r}")
+        self.mode = mode
+        self.fps = fps
+        self.poller = poller  # InputPoller: keep sampling input while waiting
+        self.spin_s = spin_ms / 1000.0
+        self.next_frame = 0.0
+        self.refresh_hz = 0   # display refresh under vsync, 0 = unknown
+
+    @property
+    def budget_ms(self):
+        """Frame budget used for dropped-frame accounting.
+
+        The refresh period under vsync when the display reports it, else
+        1000 / fps in every mode (60 fps when fps is 0).
+        """
+        if self.mode == "vsync" and self.refresh_hz > 0:
+            return 1000.0 / self.refresh_hz
+        return 1000.0 / self.fps if self.fps > 0 else 1000.0 / 60
+
+    def set_mode(self, size):
+        """Open the window, with vsync when requested and available."""
+        screen = None
+        if self.mode == "vsync":
+            try:
+                # SDL only honours vsync on renderer-backed (SCALED) windows
+                screen = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+                # pygame-ce only; plain pygame cannot report the refresh rate
+                rate = getattr(pygame.display, "get_current_refresh_rate", None)
+                self.refresh_hz = rate() if rate is not None else 0
+            except pygame.error as e:
+                print("vsync unavailable, using fixed cap:", e)
+                self.mode = "cap"
+        if self.poller is not None and self.poller.poll_hz > 0 and (self.mode != "cap" or self.fps <= 0):
+            print(f"input polling at {self.poller.poll_hz} Hz needs capped pacing; polling once per frame")
+        return screen if screen is not None else pygame.display.set_mode(size)
+
+    def wait(self):
+        """Call once per frame after display.flip()."""
+        if self.mode != "cap" or self.fps <= 0:
+            if self.poller is not None:
+                self.poller.poll()
+            return
+
+        period = 1.0 / self.fps
+        now = time.perf_counter()
+        self.next_frame += period
+        if self.next_frame < now:
+            # fell behind (hitch / first frame): don't try to catch up
+            self.next_frame = now
+            return
+
+        poll = self.poller is not None and self.poller.poll_hz > 0
+        step = 1.0 / self.poller.poll_hz if poll else period
+        # coarse sleep, leaving a short spin to hit the deadline precisely
+        while True:
+            if poll:
+                self.poller.poll()
+            remain = self.next_frame - time.perf_counter() - self.spin_s
+            if remain <= 0:
+                break
+            time.sleep(min(step, remain))
+        while time.perf_counter() < self.next_frame:
+            if poll:
+                self.poller.poll()
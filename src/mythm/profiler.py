@@ -0,0 +1,171 @@
+"""Per-frame phase timings for the game loop.
+
+`runtime.main` calls `begin()` at the top of a frame, `mark(phase)` after
+each phase and `end()` once the frame is presented. With the overlay on
+(F9) the rolling stats are drawn in the corner; with a log path every
+frame is appended as one CSV row.
+
+Allocation counts cover two call sites: direct `pygame.Surface(...)`
+constructions (`surface_ctors`) and text rasterised by the shared text
+cache on a miss (`text_renders`). Surfaces made in C by `.copy()`,
+`.convert()`, `subsurface` or `pygame.transform` are not counted.
+"""
+import csv
+import gc
+import time
+from collections import deque
+
+import pygame
+
+from mythm.textcache import TEXT
+
+PHASES = ("spawn", "events", "auto_miss", "holds", "feedback", "render", "fx_text", "overlay", "flip")
+
+
+class CountingSurface(pygame.Surface):
+    """pygame.Surface that counts direct constructions while swapped in."""
+
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingSurface.created += 1
+
+
+class FrameProfiler:
+    def __init__(self, budget_ms=1000/60, window=600, log_path=None):
+        self.budget_ms = budget_ms
+        self.frames = deque(maxlen=window)  # work time per frame (ms)
+        self.overlay = False
+        self.log_path = log_path
+        self._log = None
+        self._writer = None
+        self.dropped = 0
+        self.frame_no = 0
+        self.phase_ms = dict.fromkeys(PHASES, 0.0)
+        self.surface_ctors = 0
+        self.text_renders = 0
+        self.gc_ms = 0.0
+        self.gc_runs = 0
+        self.interval_ms = 0.0
+        self._t0 = self._last = self._prev_begin = 0.0
+        self._in_frame = False  # begin() ran while active
+        self._gc_start = 0.0
+        self._surf_base = 0
+        self._text_base = 0
+        self._stats = (0.0, 0.0, 0.0)
+        self._orig_surface = pygame.Surface
+        if log_path:
+            self._set_active(True)
+
+    @property
+    def active(self):
+        return self.overlay or self._log is not None
+
+    def toggle_overlay(self):
+        was = self.active
+        self.overlay = not self.overlay
+        if self.active != was:
+            self._set_active(self.active)
+
+    def _set_active(self, on):
+        if on and self.log_path and self._log is None:
+            self._log = open(self.log_path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._log)
+            self._writer.writerow(("frame", "total_ms", "interval_ms", *PHASES,
+                                   "surface_ctors", "text_renders", "gc_runs", "gc_ms"))
+        # a frame half-timed across the toggle, or the gap since the last
+        # active frame, is not a real frame
+        self._in_frame = False
+        self._prev_begin = 0.0
+        # count direct `pygame.Surface(...)` constructions
+        pygame.Surface = CountingSurface if on else self._orig_surface
+        if on and self._gc_cb not in gc.callbacks:
+            gc.callbacks.append(self._gc_cb)
+        elif not on and self._gc_cb in gc.callbacks:
+            gc.callbacks.remove(self._gc_cb)
+
+    def _gc_cb(self, phase, info):
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        else:
+            self.gc_ms += (time.perf_counter() - self._gc_start) * 1000
+            self.gc_runs += 1
+
+    # ---------------- per frame ----------------
+    def begin(self):
+        if not self.active:
+            return
+        t = time.perf_counter()
+        self.interval_ms = (t - self._prev_begin) * 1000 if self._prev_begin else 0.0
+        if self.interval_ms > self.budget_ms * 1.5:
+            self.dropped += 1
+        self._prev_begin = self._t0 = self._last = t
+        self._in_frame = True
+        for k in self.phase_ms:
+            self.phase_ms[k] = 0.0
+        self._surf_base = CountingSurface.created
+        self._text_base = TEXT.misses
+        self.gc_ms = 0.0
+        self.gc_runs = 0
+
+    def mark(self, phase):
+        if not self._in_frame:
+            return
+        t = time.perf_counter()
+        self.phase_ms[phase] += (t - self._last) * 1000
+        self._last = t
+
+    def end(self):
+        if not self._in_frame:
+            return
+        self._in_frame = False
+        total = (time.perf_counter() - self._t0) * 1000
+        self.frames.append(total)
+        self.surface_ctors = CountingSurface.created - self._surf_base
+        self.text_renders = TEXT.misses - self._text_base
+        self.frame_no += 1
+        if self.frame_no % 30 == 0:
+            self._stats = self.percentiles()
+        if self._writer is not None:
+            self._writer.writerow((
+                self.frame_no, round(total, 3), round(self.interval_ms, 3),
+                *(round(self.phase_ms[p], 3) for p in PHASES),
+                self.surface_ctors, self.text_renders, self.gc_runs, round(self.gc_ms, 3),
+            ))
+
+    def percentiles(self):
+        """Rolling (p50, p95, p99) of frame work time in ms."""
+        if not self.frames:
+            return 0.0, 0.0, 0.0
+        s = sorted(self.frames)
+        n = len(s) - 1
+        return s[int(n * 0.50)], s[int(n * 0.95)], s[int(n * 0.99)]
+
+    def draw(self, screen, font):
+        """Draw the overlay (if shown); returns the rect it covers or None."""
+        if not self.overlay:
+            return None
+        p50, p95, p99 = self._stats
+        lines = [
+            f"frame p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f} ms",
+            f"dropped {self.dropped}  Surface() {self.surface_ctors}  text {self.text_renders}",
+            f"gc {self.gc_runs} ({self.gc_ms:.2f} ms)",
+        ]
+        lines += [f"{p:<9} {self.phase_ms[p]:6.2f} ms" for p in PHASES]
+        x = screen.get_width() - 330
+        y = 110
+        bg = self._orig_surface((320, 20 * len(lines) + 8), pygame.SRCALPHA)
+        bg.fill((0, 0, 0, 170))
+        rect = screen.blit(bg, (x - 6, y - 4))
+        for ln in lines:
+            screen.blit(font.render(ln, True, (200, 255, 200)), (x, y))
+            y += 20
+        return rect
+
+    def close(self):
+        self._set_active(False)
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+            self._writer = None
@@ -1,29 +1,73 @@
 import pygame
-from mythm.config import BASE_R, NEAR_SCALE, W, H, JUDGE_Y, SPAWN_TIME, LR6_GAP_PX, LR6_LANE_W, LR6_LANE_PAD
+from mythm.notes import NoteWindow, HOLD
+from mythm.textcache import render_text
+from mythm.config import BASE_R, NEAR_SCALE, W, H, BG, JUDGE_Y, SPAWN_TIME
 
 
 
 class HitFlash:
-    def __init__(self):
-        self.events = []  # (x,y, start_now, dur, color)
+    """Expanding-ring hit flashes.
+
+    The ring animation (radius 18 -> 88, alpha 180 -> 0) is pre-rendered
+    per colour into a sprite atlas of STEPS frames, so drawing a flash is
+    a single blit of one atlas cell. Events live in a fixed pool of
+    `capacity` slots; when it is full the oldest flash is replaced.
+    """
+
+    STEPS = 24
+    R0, GROW, RING_W = 18, 70, 6
+
+    def __init__(self, capacity=32):
+        self.capacity = capacity
+        self._x = [0]*capacity
+        self._y = [0]*capacity
+        self._start = [0]*capacity
+        self._dur = [1]*capacity
+        self._atlas = [None]*capacity  # None = free slot
+        self._next = 0
+        self._atlases = {}  # color -> (sheet, [(r, area)] per step)
+
+    def _atlas_for(self, color):
+        atlas = self._atlases.get(color)
+        if atlas is None:
+            size = 2 * (self.R0 + self.GROW)
+            sheet = pygame.Surface((size * self.STEPS, size), pygame.SRCALPHA)
+            cells = []
+            for k in range(self.STEPS):
+                t = k / self.STEPS
+                r = int(self.R0 + self.GROW*t)
+                a = int(180*(1-t))
+                area = pygame.Rect(k*size, 0, r*2, r*2)
+                pygame.draw.circle(sheet, (*color, a), (area.x + r, r), r, width=self.RING_W)
+                cells.append((r, area))
+            atlas = self._atlases[color] = (sheet, cells)
+        return atlas
 
     def add(self, x, y, now, color, dur=180):
-        self.events.append((x, y, now, dur, color))
-
-    def draw(self, screen, now):
-        for ev in self.events[:]:
-            x,y,st,dur,col = ev
-            t = (now - st) / dur
+        i = self._next
+        self._next = (i + 1) % self.capacity
+        self._x[i], self._y[i], self._start[i], self._dur[i] = x, y, now, dur
+        self._atlas[i] = self._atlas_for(tuple(color))
+
+    def clear(self):
+        self._atlas = [None]*self.capacity
+
+    def draw(self, screen, now, dirty=None):
+        steps = self.STEPS
+        for i in range(self.capacity):
+            atlas = self._atlas[i]
+            if atlas is None:
+                continue
+            t = (now - self._start[i]) / self._dur[i]
             if t >= 1:
-                self.events.remove(ev)
+                self._atlas[i] = None
                 continue
-            # expanding ring + fade
-            r = int(18 + 70*t)
-            a = int(180*(1-t))
-            surf = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
-            pygame.draw.circle(surf, (*col, a), (r, r), r, width=6)
-            screen.blit(surf, (x-r, y-r))
-            
+            sheet, cells = atlas
+            r, area = cells[max(0, int(t * steps))]
+            rect = screen.blit(sheet, (self._x[i] - r, self._y[i] - r), area)
+            if dirty is not None:
+                dirty.add(rect)
+
 def lane_layout_default(lanes: int):
     lane_w = 90 if lanes == 6 else 110
     x0 = (W - lanes * lane_w) // 2
@@ -38,387 +82,303 @@ def labels_lane_mode(lanes, key_mode):
     return ["A","S","D","K","L"] if key_mode == "KEY" else ["1","2","3","4","5"]
 
 
-def _rows_y():
-    center_y = H // 2
-    row_gap = 130
-    return [center_y + row_gap, center_y, center_y - row_gap]  # bottom, mid, top
-
-def _judge_x():
-    # แยกมือซ้าย/ขวาให้เหมือน BeatUp (กว้างหน่อย)
-    hand_gap = 250
-    return W//2 - hand_gap, W//2 + hand_gap
-
-def lr6_lane_center_xy(lane: int):
-    ys = _rows_y()
-    lx, rx = _judge_x()
-    if lane in (0,1,2):
-        return lx, ys[lane]          # 0 bottom,1 mid,2 top
-    return rx, ys[lane-3]            # 3 bottom,4 mid,5 top
-
-def _draw_panel(surface, rect, radius=16):
-    # panel base
-    pygame.draw.rect(surface, (25, 25, 35), rect, border_radius=radius)
-    # subtle inner highlight
-    inner = rect.inflate(-10, -10)
-    pygame.draw.rect(surface, (40, 40, 60), inner, border_radius=radius-6)
-
-def _arrow_points(center, direction, size=18):
-    x, y = center
-    s = size
-    if direction == "UP":
-        return [(x, y-s), (x-s, y+s), (x+s, y+s)]
-    if direction == "DOWN":
-        return [(x, y+s), (x-s, y-s), (x+s, y-s)]
-    if direction == "LEFT":
-        return [(x-s, y), (x+s, y-s), (x+s, y+s)]
-    # RIGHT
-    return [(x+s, y), (x-s, y-s), (x-s, y+s)]
-
-def _draw_arrow(surface, center, direction, pressed=False):
-    # BeatUp 느낌: outline ลูกศร + pressed เป็น neon fill
-    pts = _arrow_points(center, direction, size=18)
-
-    if pressed:
-        # glow (วาดหลายชั้นให้ฟุ้ง)
-        for w, a in [(10, 40), (6, 70), (3, 140)]:
-            glow = pygame.Surface((80, 80), pygame.SRCALPHA)
-            pygame.draw.polygon(glow, (90, 255, 120, a), [(p[0]-center[0]+40, p[1]-center[1]+40) for p in pts], width=0)
-            surface.blit(glow, (center[0]-40, center[1]-40))
-        pygame.draw.polygon(surface, (80, 255, 120), pts, width=0)
-        pygame.draw.polygon(surface, (230, 255, 240), pts, width=3)
-    else:
-        pygame.draw.polygon(surface, (170, 170, 190), pts, width=3)
-
-def render_lr6_beatup_ui(screen, active, now, key_down_until, font, flash: HitFlash):
-    panel_w, panel_h = 360, 420
-    panel_y = (H - panel_h)//2 + 20
-
-    # ระยะห่างมือซ้าย/ขวา
-    hand_gap = 120
-    left_x  = W//2 - hand_gap - panel_w
-    right_x = W//2 + hand_gap
-
-    left_panel  = pygame.Rect(left_x,  panel_y, panel_w, panel_h)
-    right_panel = pygame.Rect(right_x, panel_y, panel_w, panel_h)
-
-    # slot layout
-    slot_gap = 14
-    slot_h = (panel_h - slot_gap*4)//3
-    slot_w = panel_w - 34
-    slot_x_in = 17
-
-    row_y = [
-        left_panel.y + slot_gap,
-        left_panel.y + slot_gap*2 + slot_h,
-        left_panel.y + slot_gap*3 + slot_h*2,
-    ]
-
-    def slot_rect(panel, i):
-        return pygame.Rect(panel.x + slot_x_in, row_y[i], slot_w, slot_h)
-
-    # backgrounds
-    def panel_bg(r):
-        pygame.draw.rect(screen, (28,28,40), r, border_radius=22)
-        inner = r.inflate(-14, -14)
-        pygame.draw.rect(screen, (45,45,65), inner, border_radius=18)
-
-    def draw_slot(r, pressed=False):
-        pygame.draw.rect(screen, (16,16,24), r, border_radius=18)
-        if pressed:
-            overlay = pygame.Surface((r.w, r.h), pygame.SRCALPHA)
-            overlay.fill((90,255,120,55))
-            screen.blit(overlay, (r.x, r.y))
-
-    panel_bg(left_panel)
-    panel_bg(right_panel)
-
-    # lane mapping per row
-    left_labels  = ["7","4","1"]
-    right_labels = ["9","6","3"]
-    left_lane_by_row  = [2,1,0]
-    right_lane_by_row = [5,4,3]
-
-    def slot_target_xy(lane):
-        if lane in (2,1,0):
-            panel = left_panel
-            row = {2:0, 1:1, 0:2}[lane]
-        else:
-            panel = right_panel
-            row = {5:0, 4:1, 3:2}[lane]
-        r = slot_rect(panel, row)
-        return (r.x + r.w//2, r.y + int(r.h*0.58)), r
-
-    # ✅ เส้นตัดต้องอยู่ตรง target x ของ panel (ไม่ใช่ตรงกลางจอ)
-    # ใช้ center ของ slot กลาง (row=1) เป็น ref
-    (lx, ly), _ = slot_target_xy(1)  # lane 4/left-middle
-    (rx, ry), _ = slot_target_xy(4)  # right-middle
-    pygame.draw.line(screen, (220,220,230), (lx, 0), (lx, H), 2)
-    pygame.draw.line(screen, (220,220,230), (rx, 0), (rx, H), 2)
-
-    # draw slots + labels
-    for i in range(3):
-        rL = slot_rect(left_panel, i)
-        rR = slot_rect(right_panel, i)
-
-        laneL = left_lane_by_row[i]
-        laneR = right_lane_by_row[i]
-        pressedL = key_down_until[laneL] > now
-        pressedR = key_down_until[laneR] > now
-
-        draw_slot(rL, pressedL)
-        draw_slot(rR, pressedR)
-
-        labL = font.render(left_labels[i], True, (235,235,245))
-        labR = font.render(right_labels[i], True, (235,235,245))
-        screen.blit(labL, (rL.x + 14, rL.y + 10))
-        screen.blit(labR, (rR.x + 14, rR.y + 10))
-
-    # ---- big arrow note (direction by lane) + scale near judge ----
-    def arrow_poly(center, lane, size):
-        x, y = center
-        s = size
-        if lane == 1:  # LEFT
-            return [(x-s, y), (x+s, y-s), (x+s, y+s)]
-        if lane == 4:  # RIGHT
-            return [(x+s, y), (x-s, y-s), (x-s, y+s)]
-        if lane == 2:  # ↖
-            return [(x-s, y-s), (x+s, y-s), (x-s, y+s)]
-        if lane == 5:  # ↗
-            return [(x+s, y-s), (x-s, y-s), (x+s, y+s)]
-        if lane == 0:  # ↙
-            return [(x-s, y+s), (x+s, y+s), (x-s, y-s)]
-        return [(x+s, y+s), (x-s, y+s), (x+s, y-s)]  # 3 ↘
-
-    def draw_note_circle(pos, scale, pressed=False):
-        x, y = pos
-        r = int(12 * scale)          # ขนาดหลัก
-        ring = max(2, int(3 * scale))
+class LR6Layout:
+    """LR6 geometry for one window size, computed once (see lr6_layout).
+
+    Two panels of three slots (left hand lanes 2/1/0 top to bottom, right
+    hand 5/4/3). Per lane: the slot rect, the target (hit) point, the
+    off-screen x a note spawns at and the x distance it travels to the
+    target. Shared by the renderer (notes, background) and the runtime
+    (hit flash positions).
+    """
+
+    PANEL_W, PANEL_H = 360, 420
+    HAND_GAP = 120
+    SLOT_GAP = 14
+    SLOT_X_IN = 17
+    SPAWN_OUT = 180  # spawn distance beyond the screen edge
+
+    def __init__(self, size):
+        w, h = self.size = size
+        panel_w, panel_h = self.PANEL_W, self.PANEL_H
+        panel_y = (h - panel_h)//2 + 20
+        self.left_panel  = pygame.Rect(w//2 - self.HAND_GAP - panel_w, panel_y, panel_w, panel_h)
+        self.right_panel = pygame.Rect(w//2 + self.HAND_GAP, panel_y, panel_w, panel_h)
+
+        slot_gap = self.SLOT_GAP
+        slot_h = (panel_h - slot_gap*4)//3
+        slot_w = panel_w - 2*self.SLOT_X_IN
+        row_y = [panel_y + slot_gap*(i+1) + slot_h*i for i in range(3)]
+
+        # lane -> slot rect (row 0 = top: 7/9, row 2 = bottom: 1/3)
+        self.slots = [None]*6
+        for row, (laneL, laneR) in enumerate(((2, 5), (1, 4), (0, 3))):
+            self.slots[laneL] = pygame.Rect(self.left_panel.x + self.SLOT_X_IN, row_y[row], slot_w, slot_h)
+            self.slots[laneR] = pygame.Rect(self.right_panel.x + self.SLOT_X_IN, row_y[row], slot_w, slot_h)
+        self.targets = [(r.x + r.w//2, r.y + int(r.h*0.58)) for r in self.slots]
+
+        # left lanes come in from the left edge, right lanes from the right
+        self.spawn_x = [-self.SPAWN_OUT if lane < 3 else w + self.SPAWN_OUT for lane in range(6)]
+        self.travel = [self.targets[lane][0] - self.spawn_x[lane] for lane in range(6)]
+
+
+_lr6_layouts = {}
+
+def lr6_layout(size=(W, H)):
+    layout = _lr6_layouts.get(size)
+    if layout is None:
+        layout = _lr6_layouts[size] = LR6Layout(size)
+    return layout
+
+
+# ---------------- cached static layers ----------------
+# Panels, slots, lanes, judge lines and labels never change for a given
+# layout, so they are drawn once into an opaque full-screen surface and
+# each frame starts with a single blit of it. Pressed-state overlays are
+# prebuilt alongside and blitted over the layer per pressed lane.
+_layers = {}
+
+def _cached_layer(key, build):
+    layer = _layers.get(key)
+    if layer is None:
+        layer = _layers[key] = build()
+    return layer
+
+
+class _LR6Layer:
+    """Static LR6 background plus a prebuilt pressed slot per lane."""
+
+    def __init__(self, layout: LR6Layout, font):
+        w, h = layout.size
+        self.slots = layout.slots
+        surf = pygame.Surface((w, h)).convert()
+        surf.fill(BG)
+        for r in (layout.left_panel, layout.right_panel):
+            pygame.draw.rect(surf, (28,28,40), r, border_radius=22)
+            pygame.draw.rect(surf, (45,45,65), r.inflate(-14, -14), border_radius=18)
+
+        # judge lines through the middle-row targets
+        for lane in (1, 4):
+            x = layout.targets[lane][0]
+            pygame.draw.line(surf, (220,220,230), (x, 0), (x, h), 2)
+
+        for r in self.slots:
+            pygame.draw.rect(surf, (16,16,24), r, border_radius=18)
+
+        labels = {2:"7", 1:"4", 0:"1", 5:"9", 4:"6", 3:"3"}
+        tint = pygame.Surface(self.slots[0].size, pygame.SRCALPHA)
+        tint.fill((90,255,120,55))
+        self.pressed = []
+        for lane, r in enumerate(self.slots):
+            lab = render_text(font, labels[lane], (235,235,245))
+            img = surf.subsurface(r).copy()
+            img.blit(tint, (0, 0))
+            img.blit(lab, (14, 10))
+            self.pressed.append(img)
+            surf.blit(lab, (r.x + 14, r.y + 10))
+        self.surface = surf
+
+
+class _NoteSprites:
+    """Pre-rendered LR6 note heads, glows and hold bars.
+
+    Heads and glows are keyed by their integer radius (the only thing the
+    scale changes once rounded), so they match the old per-frame circles
+    pixel for pixel. A hold bar is a rounded rect; for each bar height one
+    long bar strip is drawn and a bar of any width is its left cap, a
+    middle slice and its right cap blitted from that strip.
+    """
+
+    STRIP_W = W + 400
+    LUT_N = 512  # scale lookup steps over p in [0, 1]
 
+    def __init__(self):
+        self.scale_lut = [0.95 + ((k / self.LUT_N) ** 2.2) * NEAR_SCALE for k in range(self.LUT_N + 1)]
+        self._heads = {}
+        self._glows = {}
+        self._strips = {}
+        self._short = {}
+
+    def scale(self, pp):
+        return self.scale_lut[int(pp * self.LUT_N)]
+
+    def head(self, r, ring):
+        s = self._heads.get((r, ring))
+        if s is None:
+            s = self._heads[(r, ring)] = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
+            pygame.draw.circle(s, (255,210,210), (r, r), r)
+            pygame.draw.circle(s, (255,255,255), (r, r), r, width=ring)
+        return s
+
+    def glow(self, glow_r):
+        s = self._glows.get(glow_r)
+        if s is None:
+            s = self._glows[glow_r] = pygame.Surface((glow_r*2, glow_r*2), pygame.SRCALPHA)
+            pygame.draw.circle(s, (90,255,120,70), (glow_r, glow_r), glow_r)
+        return s
+
+    def _bar(self, w, h, pad=0):
+        # pad: very short bars (w < h) spill their rounded ends past the rect
+        s = pygame.Surface((w + 2*pad, h + 2*pad), pygame.SRCALPHA)
+        r = pygame.Rect(pad, pad, w, h)
+        pygame.draw.rect(s, (255,210,210), r, border_radius=h//2)
+        pygame.draw.rect(s, (255,255,255), r, width=3, border_radius=h//2)
+        return s
+
+    def strip(self, h):
+        st = self._strips.get(h)
+        if st is None:
+            tint = pygame.Surface((self.STRIP_W, h), pygame.SRCALPHA)
+            tint.fill((90, 255, 120, 55))
+            st = self._strips[h] = (self._bar(self.STRIP_W, h), tint, h//2 + 1)
+        return st
+
+    def add_bar(self, batch, bar, pressed):
+        """Append the blits for one hold bar (and its pressed tint) to batch."""
+        strip, tint, cap = self.strip(bar.h)
         if pressed:
-            # glow
-            glow_r = r + 18
-            surf = pygame.Surface((glow_r*2, glow_r*2), pygame.SRCALPHA)
-            pygame.draw.circle(surf, (90,255,120,70), (glow_r, glow_r), glow_r)
-            screen.blit(surf, (x-glow_r, y-glow_r))
-
-        # main circle
-        pygame.draw.circle(screen, (255,210,210), (x, y), r)
-        pygame.draw.circle(screen, (255,255,255), (x, y), r, width=ring)
-
-    # notes travel + scale when close to judge
-    # notes travel + scale when close to judge
-    for n in active:
-        if n.get("hit"):
-            continue
+            batch.append((tint, bar.topleft, (0, 0, bar.w, bar.h)))
+        if bar.w < 2 * cap:
+            key = (bar.w, bar.h)
+            s = self._short.get(key)
+            if s is None:
+                s = self._short[key] = self._bar(bar.w, bar.h, pad=bar.h)
+            batch.append((s, (bar.x - bar.h, bar.y - bar.h)))
+            return
+        x, y = bar.topleft
+        batch.append((strip, (x, y), (0, 0, cap, bar.h)))
+        batch.append((strip, (x + cap, y), (cap, 0, bar.w - 2*cap, bar.h)))
+        batch.append((strip, (x + bar.w - cap, y), (self.STRIP_W - cap, 0, cap, bar.h)))
+
+
+_note_sprites = None
+
+
+def _draw_layer(screen, layer, dirty):
+    """Full background blit, or (dirty-rect mode) repaint under last frame only."""
+    if dirty is None:
+        screen.blit(layer.surface, (0, 0))
+    else:
+        dirty.restore(screen, layer.surface)
 
-        lane = max(0, min(5, int(n.get("lane", 0))))
-        (tx, ty), _ = slot_target_xy(lane)
 
-        t0 = int(n.get("tMs", 0))
-        note_type = n.get("type", "tap")
-        dur = int(n.get("durMs", 500)) if note_type == "hold" else 0
-        t1 = t0 + dur
+def render_lr6_beatup_ui(screen, window: NoteWindow, now, key_down_until, font, flash: HitFlash, dirty=None):
+    layout = lr6_layout(screen.get_size())
+    layer = _cached_layer(("LR6", layout.size, font), lambda: _LR6Layer(layout, font))
+    _draw_layer(screen, layer, dirty)
+    for lane in range(6):
+        if key_down_until[lane] > now:
+            rect = screen.blit(layer.pressed[lane], layout.slots[lane].topleft)
+            if dirty is not None:
+                dirty.add(rect)
+
+    # notes travel + scale when close to judge; all blits go out in one batch
+    global _note_sprites
+    if _note_sprites is None:
+        _note_sprites = _NoteSprites()
+    sprites = _note_sprites
+    batch = []
+    chart = window.chart
+    t_ms, lanes, kinds, durs = chart.t_ms, chart.lane, chart.kind, chart.dur_ms
+    targets, spawn_x, travel = layout.targets, layout.spawn_x, layout.travel
+    # heads are drawn from p = 0 (spawn) to p = 1.25 (past the target)
+    for i in window.visible(now - SPAWN_TIME // 4, now + SPAWN_TIME):
+        lane = lanes[i]
+        ty = targets[lane][1]
+        start_x, dx = spawn_x[lane], travel[lane]
+
+        t0 = t_ms[i]
+        is_hold = kinds[i] == HOLD
+        t1 = t0 + durs[i]
 
         # progress for head (start)
         p = (now - (t0 - SPAWN_TIME)) / max(1, SPAWN_TIME)  # 0..1 at judge
-        if p < 0 or p > 1.25:
+        if p < 0 or (p > 1.25 and not is_hold):
             continue
 
-        if lane in (2,1,0):
-            start_x = -180
-            x = int(start_x + max(0.0, min(1.0, p)) * (tx - start_x))
-        else:
-            start_x = W + 180
-            x = int(start_x + max(0.0, min(1.0, p)) * (tx - start_x))
+        pp = max(0.0, min(1.0, p))
+        x = int(start_x + pp * dx)
 
         # ✅ โตตอนใกล้เส้น (ใกล้ 1.0 ใหญ่สุด)
-        pp = max(0.0, min(1.0, p))
-        scale = 0.95 + (pp ** 2.2) * NEAR_SCALE
+        scale = sprites.scale(pp)
 
         pressed = key_down_until[lane] > now
 
         # HOLD body: draw bar from head->tail (tail = end time)
-        if note_type == "hold":
+        if is_hold:
             p_end = (now - (t1 - SPAWN_TIME)) / max(1, SPAWN_TIME)
             p_end = max(0.0, min(1.25, p_end))
-
-            if lane in (2,1,0):
-                x_end = int(start_x + max(0.0, min(1.0, p_end)) * (tx - start_x))
-            else:
-                x_end = int(start_x + max(0.0, min(1.0, p_end)) * (tx - start_x))
+            x_end = int(start_x + min(1.0, p_end) * dx)
 
             r_bar = int(BASE_R * scale)
             bar_h = max(10, int(r_bar * 1.05))
             bx = min(x, x_end)
-            bw = abs(x - x_end)
-            if bw < 4:
-                bw = 4
-            bar = pygame.Rect(bx, ty - bar_h//2, bw, bar_h)
-
-            if pressed:
-                overlay = pygame.Surface((bar.w, bar.h), pygame.SRCALPHA)
-                overlay.fill((90, 255, 120, 55))
-                screen.blit(overlay, (bar.x, bar.y))
+            bw = max(4, abs(x - x_end))
+            sprites.add_bar(batch, pygame.Rect(bx, ty - bar_h//2, bw, bar_h), pressed)
 
-            pygame.draw.rect(screen, (255,210,210), bar, border_radius=bar_h//2)
-            pygame.draw.rect(screen, (255,255,255), bar, width=3, border_radius=bar_h//2)
+        r = int(12 * scale)          # ขนาดหลัก
+        if pressed:
+            glow_r = r + 18
+            batch.append((sprites.glow(glow_r), (x-glow_r, ty-glow_r)))
+        batch.append((sprites.head(r, max(2, int(3 * scale))), (x-r, ty-r)))
 
-        draw_note_circle((x, ty), scale, pressed=pressed)
+    rects = screen.blits(batch, doreturn=dirty is not None)
+    if dirty is not None:
+        dirty.extend(rects)
 
 
     # ✅ hit flash overlay (ต้องเรียกหลังวาด pad/notes)
-    flash.draw(screen, now)
+    flash.draw(screen, now, dirty)
 
         
-def render_multilane(screen, active, now, lanes, lane_w, x0, key_mode, key_down_until, font):
-    labs = labels_lane_mode(lanes, key_mode)
-
+class _LaneLayer:
+    """Static multi-lane background; a pressed lane gets a tint (alpha set
+    per blit) with its pad and label redrawn on top."""
+
+    def __init__(self, lanes, lane_w, x0, key_mode, font):
+        labs = labels_lane_mode(lanes, key_mode)
+        surf = pygame.Surface((W, H)).convert()
+        surf.fill(BG)
+        self.pads = []
+        for i in range(lanes):
+            x = x0 + i * lane_w
+            pygame.draw.rect(surf, (60,60,85), (x, 0, lane_w-6, H), border_radius=8)
+            pygame.draw.line(surf, (255,255,255), (x, JUDGE_Y), (x+lane_w-6, JUDGE_Y), 2)
+
+            pad = pygame.Surface((lane_w-6, 36), pygame.SRCALPHA)
+            pygame.draw.rect(pad, (35,35,50), pad.get_rect(), border_radius=8)
+            pad.blit(render_text(font, labs[i], (220,220,220)), (10, 6))
+            surf.blit(pad, (x, H-42))
+            self.pads.append(pad)
+        self.tint = pygame.Surface((lane_w-6, H)).convert()
+        self.tint.fill((180,220,255))
+        self.surface = surf
+
+
+def render_multilane(screen, window: NoteWindow, now, lanes, lane_w, x0, key_mode, key_down_until, font, dirty=None):
+    layer = _cached_layer(("LANE", lanes, lane_w, x0, key_mode, font),
+                          lambda: _LaneLayer(lanes, lane_w, x0, key_mode, font))
+    _draw_layer(screen, layer, dirty)
     for i in range(lanes):
-        x = x0 + i * lane_w
-        pygame.draw.rect(screen, (60,60,85), (x, 0, lane_w-6, H), border_radius=8)
-        pygame.draw.line(screen, (255,255,255), (x, JUDGE_Y), (x+lane_w-6, JUDGE_Y), 2)
-
         if key_down_until[i] > now:
+            x = x0 + i * lane_w
             remain = key_down_until[i] - now
-            alpha = int(160 * (remain / 120))
-            overlay = pygame.Surface((lane_w-6, H), pygame.SRCALPHA)
-            overlay.fill((180,220,255, max(0, min(255, alpha))))
-            screen.blit(overlay, (x, 0))
-
-        pad = pygame.Rect(x, H-42, lane_w-6, 36)
-        pygame.draw.rect(screen, (35,35,50), pad, border_radius=8)
-        screen.blit(font.render(labs[i], True, (220,220,220)), (x+10, H-36))
-
-    for n in active:
-        if n["hit"]:
-            continue
-        p = (now - (n["tMs"] - SPAWN_TIME)) / max(1, SPAWN_TIME)
+            layer.tint.set_alpha(max(0, min(255, int(160 * (remain / 120)))))
+            rect = screen.blit(layer.tint, (x, 0))
+            screen.blit(layer.pads[i], (x, H-42))
+            if dirty is not None:
+                dirty.add(rect)
+
+    t_ms, note_lanes = window.chart.t_ms, window.chart.lane
+    # y = p * JUDGE_Y is on screen for p in (0, H / JUDGE_Y)
+    for i in window.visible(now - SPAWN_TIME * (H - JUDGE_Y) // JUDGE_Y - 1, now + SPAWN_TIME, holds=False):
+        p = (now - (t_ms[i] - SPAWN_TIME)) / max(1, SPAWN_TIME)
         if p < 0:
             continue
         y = p * JUDGE_Y
         if 0 < y < H:
-            lane = int(n.get("lane", 0))
+            lane = note_lanes[i]
             cx = lane_center_x(x0, lane_w, lane)
-            pygame.draw.circle(screen, (255,210,210), (cx, int(y)), 14)
-
-def lr6_x_positions():
-    # 3 lanes left + GAP + 3 lanes right
-    lane_w = LR6_LANE_W
-    gap = LR6_GAP_PX
-    total_w = 3*lane_w + gap + 3*lane_w
-    x0 = (W - total_w) // 2
-
-    xs = []
-    # left 0,1,2
-    for i in range(3):
-        xs.append(x0 + i*lane_w)
-    # right 3,4,5
-    right_start = x0 + 3*lane_w + gap
-    for i in range(3):
-        xs.append(right_start + i*lane_w)
-    return xs, lane_w
-
-def lr6_rows():
-    # spacing ชัด อ่านง่าย
-    center_y = H // 2
-    row_gap = 120
-    return [
-        center_y + row_gap,   # bottom -> 1 / 3
-        center_y,             # mid    -> 4 / 6
-        center_y - row_gap,   # top    -> 7 / 9
-    ]
-    
-def lr6_judge_x():
-    # แยกมือซ้าย/ขวาชัด ๆ
-    hand_gap = 220   # ยิ่งมาก ยิ่งแยก
-    left_jx  = W//2 - hand_gap
-    right_jx = W//2 + hand_gap
-    return left_jx, right_jx
-
-def lr6_hit_xy_for_lane(lane: int):
-    # ต้องเหมือน layout ใน render_lr6_beatup_ui
-    panel_w, panel_h = 360, 420
-    panel_y = (H - panel_h)//2 + 20
-    hand_gap = 120
-    left_x  = W//2 - hand_gap - panel_w
-    right_x = W//2 + hand_gap
-    left_panel  = pygame.Rect(left_x,  panel_y, panel_w, panel_h)
-    right_panel = pygame.Rect(right_x, panel_y, panel_w, panel_h)
-
-    slot_gap = 14
-    slot_h = (panel_h - slot_gap*4)//3
-    slot_w = panel_w - 34
-    slot_x_in = 17
-    row_y = [
-        left_panel.y + slot_gap,
-        left_panel.y + slot_gap*2 + slot_h,
-        left_panel.y + slot_gap*3 + slot_h*2,
-    ]
-    def slot_rect(panel, i):
-        return pygame.Rect(panel.x + slot_x_in, row_y[i], slot_w, slot_h)
-
-    lane = max(0, min(5, int(lane)))
-    if lane in (2,1,0):
-        panel = left_panel
-        row = {2:0, 1:1, 0:2}[lane]
-    else:
-        panel = right_panel
-        row = {5:0, 4:1, 3:2}[lane]
-    r = slot_rect(panel, row)
-    return (r.x + r.w//2, r.y + int(r.h*0.58))
-
-def render_lr6_horizontal(screen, active, now, key_down_until, font):
-    ys = lr6_rows()
-    left_jx, right_jx = lr6_judge_x()
-
-    # draw 2 judge lines (vertical)
-    pygame.draw.line(screen, (255,255,255), (left_jx, 0), (left_jx, H), 2)
-    pygame.draw.line(screen, (255,255,255), (right_jx, 0), (right_jx, H), 2)
-
-    # lane pads (labels)
-    # lane -> label
-    labs = {2:"7", 1:"4", 0:"1", 5:"9", 4:"6", 3:"3"}
-
-    # draw pads near judge lines
-    pad_w, pad_h = 140, 68
-    for lane in range(6):
-        jx, y = lr6_lane_center_xy(lane)
-        x = jx - pad_w//2
-        r = pygame.Rect(x, y - pad_h//2, pad_w, pad_h)
-
-        pygame.draw.rect(screen, (60,60,85), r, border_radius=14)
-
-        if key_down_until[lane] > now:
-            overlay = pygame.Surface((pad_w, pad_h), pygame.SRCALPHA)
-            overlay.fill((200,235,255,140))
-            screen.blit(overlay, (x, y - pad_h//2))
-
-        screen.blit(font.render(labs[lane], True, (230,230,230)), (x + 12, y - 14))
-
-    # notes travel horizontally toward judge line
-    for n in active:
-        if n["hit"]:
-            continue
-
-        lane = int(n.get("lane", 0))
-        lane = max(0, min(5, lane))
-
-        jx, y = lr6_lane_center_xy(lane)
-
-        p = (now - (n["tMs"] - SPAWN_TIME)) / max(1, SPAWN_TIME)  # 0..1 at judge
-        if p < 0:
-            continue
-        if p > 1.2:
-            continue
-
-        # left lanes: from offscreen left -> left_jx
-        # right lanes: from offscreen right -> right_jx
-        if lane in (0,1,2):
-            start_x = -80
-            x = int(start_x + p * (jx - start_x))
-        else:
-            start_x = W + 80
-            x = int(start_x + p * (jx - start_x))
-
-        if -100 < x < W + 100:
-            pygame.draw.circle(screen, (255,210,210), (x, int(y)), 16)
\ No newline at end of file
+            rect = pygame.draw.circle(screen, (255,210,210), (cx, int(y)), 14)
+            if dirty is not None:
+                dirty.add(rect)
@@ -0,0 +1,194 @@
+"""Input replays: record lane presses during play, feed them back offline.
+
+File layout (little endian):
+    b"MYRP" | u8 version | u16 header length | header JSON (utf-8)
+    | u32 event count | events
+
+Each event is a zigzag varint of the delta to the previous event's song
+time (ms) followed by one byte `lane | down << 3`. A typical press/release
+pair costs 4 bytes.
+"""
+import json
+import os
+import struct
+import time
+from datetime import datetime
+
+from mythm.config import W, H, JUDGE_Y, KEY_HOLD_MS
+from mythm.engine import GameSession, SimClock, EV_MISS
+from mythm.songs import load_chart
+
+MAGIC = b"MYRP"
+VERSION = 1
+REPLAY_DIR = "replays"
+
+
+def _put_varint(out: bytearray, v: int):
+    v = (v << 1) ^ (v >> 63)  # zigzag: small negatives stay small
+    while True:
+        b = v & 0x7F
+        v >>= 7
+        if v:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return
+
+
+def _get_varint(buf, pos):
+    v = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        v |= (b & 0x7F) << shift
+        if not b & 0x80:
+            break
+        shift += 7
+    return (v >> 1) ^ -(v & 1), pos
+
+
+class Replay:
+    """Session settings plus every lane input as (t_ms, lane, down)."""
+
+    def __init__(self, info=None, events=None):
+        self.info = dict(info or {})  # artist, song, lanes, diff, input_mode, key_mode, offsetMs
+        self.events = list(events or [])
+
+    def record(self, t_ms, lane, down):
+        self.events.append((int(t_ms), int(lane), bool(down)))
+
+    def to_bytes(self):
+        head = json.dumps(self.info, ensure_ascii=False).encode("utf-8")
+        out = bytearray(MAGIC)
+        out += struct.pack("<BH", VERSION, len(head))
+        out += head
+        out += struct.pack("<I", len(self.events))
+        prev = 0
+        for t_ms, lane, down in self.events:
+            _put_varint(out, t_ms - prev)
+            out.append(lane | (int(down) << 3))
+            prev = t_ms
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, buf):
+        if buf[:4] != MAGIC:
+            raise ValueError("Not a mythm replay")
+        version, head_len = struct.unpack_from("<BH", buf, 4)
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        pos = 7
+        info = json.loads(buf[pos:pos + head_len].decode("utf-8"))
+        pos += head_len
+        (count,) = struct.unpack_from("<I", buf, pos)
+        pos += 4
+        events = []
+        t_ms = 0
+        for _ in range(count):
+            dt, pos = _get_varint(buf, pos)
+            b = buf[pos]
+            pos += 1
+            t_ms += dt
+            events.append((t_ms, b & 0x7, bool(b >> 3)))
+        return cls(info, events)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def default_path(self):
+        i = self.info
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return os.path.join(REPLAY_DIR, f"{i['artist']}-{i['song']}-{i['lanes']}_{i['diff']}-{stamp}.myr")
+
+
+def play_back(replay, chart, frame_ms=1000/60, render=False):
+    """Feed a replay through a fresh GameSession as fast as possible.
+
+    Returns the session summary; with `render` it also draws every frame
+    with the matching renderer and adds frame time stats.
+    """
+    session = GameSession(chart, SimClock())
+    if not render:
+        session.run(replay.events, frame_ms=frame_ms)
+        return session.summary()
+
+    import pygame
+    from mythm.renderers import (
+        HitFlash, lane_layout_default, lane_center_x,
+        render_lr6_beatup_ui, render_multilane, lr6_layout,
+    )
+
+    info = replay.info
+    lr6 = info.get("input_mode", "LR6") == "LR6"
+    lanes = int(info.get("lanes", 6))
+    key_mode = info.get("key_mode", "KEY")
+    lane_w, x0 = lane_layout_default(lanes)
+
+    pygame.init()
+    screen = pygame.display.set_mode((W, H))
+    font = pygame.font.SysFont("Arial", 22)
+    layout = lr6_layout(screen.get_size())
+    flash = HitFlash()
+    key_down_until = [0]*6
+
+    events = replay.events
+    k = 0
+    now = 0.0
+    frame_times = []
+    while True:
+        t0 = time.perf_counter()
+        batch_end = k
+        while batch_end < len(events) and events[batch_end][0] <= now:
+            t_ms, lane, down = events[batch_end]
+            if down:
+                key_down_until[lane] = t_ms + KEY_HOLD_MS
+            batch_end += 1
+        session.step(now, events[k:batch_end])
+        k = batch_end
+        for kind, lane, ev_t, res, d in session.events:
+            if kind != EV_MISS:
+                hx, hy = layout.targets[lane] if lr6 else (lane_center_x(x0, lane_w, lane), JUDGE_Y)
+                flash.add(hx, hy, ev_t, (160, 220, 255))
+        session.events.clear()
+
+        if lr6:
+            render_lr6_beatup_ui(screen, session.window, now, key_down_until, font, flash)
+        else:
+            render_multilane(screen, session.window, now, lanes, lane_w, x0, key_mode, key_down_until[:lanes], font)
+        pygame.display.flip()
+        pygame.event.pump()
+        frame_times.append((time.perf_counter() - t0) * 1000)
+
+        if k >= len(events) and session.finished(now):
+            break
+        now += frame_ms
+    pygame.quit()
+
+    frame_times.sort()
+    out = session.summary()
+    out["frames"] = len(frame_times)
+    out["frame_ms_mean"] = round(sum(frame_times) / max(1, len(frame_times)), 3)
+    out["frame_ms_p95"] = round(frame_times[int(len(frame_times) * 0.95)], 3) if frame_times else 0
+    return out
+
+
+def main(path, render=False, frame_ms=1000/60):
+    rp = Replay.load(path)
+    i = rp.info
+    chart, err = load_chart(i["artist"], i["song"], int(i["lanes"]), i["diff"])
+    if chart is None:
+        raise SystemExit(err)
+    print(f"Replay {path}: {i['artist']} - {i['song']} {i['lanes']}_{i['diff']} ({len(rp.events)} inputs)")
+    t0 = time.perf_counter()
+    res = play_back(rp, chart, frame_ms=frame_ms, render=render)
+    print(res)
+    print(f"done in {time.perf_counter() - t0:.3f}s")
+    return res
@@ -1,15 +1,29 @@
 import os
-import json
 from pathlib import Path
 import pygame
 
 from mythm.config import (
-    W, H, JUDGE_Y, SPAWN_TIME,
+    W, H, BG, JUDGE_Y,
     COUNTDOWN_MS, GO_MS,
-    GREAT, MISS_AT, KEY_HOLD_MS,
+    KEY_HOLD_MS,
 )
-from mythm.judge import judge
+from mythm.timing import InputPoller, SongClock
+from mythm.profiler import FrameProfiler
+from mythm.pacing import FramePacer
 from mythm.fx import FX
+from mythm.notes import Chart
+from mythm.songs import audio_path, ChartCache
+from mythm.library import Library
+from mythm.loader import SongLoader, read_song
+from mythm.replay import Replay
+from mythm.textcache import render_text, blit_alpha
+from mythm.dirty import DirtyRects
+from mythm.calibration import Calibration, machine_latency_ms, save_machine_latency
+from mythm.engine import (
+    GameSession, EV_HIT, EV_MISS, EV_HOLD_START, EV_HOLD_DONE,
+    STATE_SELECT, STATE_COUNTDOWN, STATE_PLAYING, STATE_PAUSE_CD, STATE_CALIBRATE,
+    forwards_lane_key,
+)
 from mythm.input_modes import LR6_KEYS, keymaps_lane_mode
 from mythm.renderers import (
     lane_layout_default,
@@ -17,52 +31,17 @@ from mythm.renderers import (
     render_multilane,
     render_lr6_beatup_ui,
     HitFlash,
-    lr6_hit_xy_for_lane,
+    lr6_layout,
 )
 
-# ---------------- Song FS ----------------
-def list_songs():
-    out = []
-    base = "songs"
-    if not os.path.isdir(base):
-        return out
-    for artist in sorted(os.listdir(base)):
-        ap = os.path.join(base, artist)
-        if not os.path.isdir(ap):
-            continue
-        for song in sorted(os.listdir(ap)):
-            sp = os.path.join(ap, song)
-            if os.path.isdir(sp):
-                out.append((artist, song))
-    return out
-
-def song_base(a, s): return os.path.join("songs", a, s)
-def meta_path(a, s): return os.path.join(song_base(a, s), "meta.json")
-def audio_path(a, s): return os.path.join(song_base(a, s), "song.wav")
-
-def chart_path(a, s, lanes, diff):
-    return os.path.join(song_base(a, s), "charts", f"{lanes}_{diff}.json")
-
-def load_meta(a, s):
-    return json.load(open(meta_path(a, s), encoding="utf-8"))
-
-def load_chart(a, s, lanes, diff):
-    p = chart_path(a, s, lanes, diff)
-    if not os.path.exists(p):
-        return None, f"Missing chart: {p}"
-    j = json.load(open(p, encoding="utf-8"))
-    notes = sorted(j.get("notes", []), key=lambda n: n["tMs"])
-    if len(notes) == 0:
-        return notes, "Chart has 0 notes (regen needed)."
-    return notes, None
-
 # ---------------- Timing ----------------
-def song_now_ms(offset_ms: int) -> int:
-    """Lock game time to audio playback position."""
-    p = pygame.mixer.music.get_pos()  # ms since play/unpause, pauses stop advancing
-    if p < 0:
-        p = 0
-    return int(p) + int(offset_ms)
+def song_now_ms(offset_ms: int, clock: SongClock, latency_ms: int = 0) -> int:
+    """Lock game time to audio playback position (smoothed, see SongClock).
+
+    offset_ms is the song's own offset (meta.json); latency_ms is this
+    machine's calibrated audio+input latency (see calibration.py).
+    """
+    return int(clock.now()) + int(offset_ms) - int(latency_ms)
 
 # ---------------- UI helpers ----------------
 def draw_button(screen, rect, text, font, big=False, enabled=True):
@@ -70,21 +49,40 @@ def draw_button(screen, rect, text, font, big=False, enabled=True):
     pygame.draw.rect(screen, col, rect, border_radius=14)
     pygame.draw.rect(screen, (235, 235, 245), rect, width=2, border_radius=14)
     f = font
-    s = f.render(text, True, (255, 255, 255) if enabled else (180, 180, 190))
+    s = render_text(f, text, (255, 255, 255) if enabled else (180, 180, 190))
     screen.blit(s, (rect.x + rect.w//2 - s.get_width()//2, rect.y + rect.h//2 - s.get_height()//2))
+    return rect
 
-def main():
+def main(input_hz: int = 0, profile_log: str | None = None, pacing: str = "cap", fps: int = 60,
+         dirty_rects: bool = False):
+    # the profiler swaps pygame.Surface while active; put it back however we exit
+    prof = FrameProfiler(log_path=profile_log)
+    try:
+        _main(prof, input_hz, pacing, fps, dirty_rects)
+    finally:
+        prof.close()
+
+def _main(prof, input_hz, pacing, fps, dirty_rects):
     pygame.mixer.pre_init(44100, -16, 2, 2048)
     pygame.init()
     
     pygame.mixer.init()
 
-    screen = pygame.display.set_mode((W, H))
+    poller = InputPoller(input_hz)
+    pacer = FramePacer(pacing, fps, poller)
+    screen = pacer.set_mode((W, H))
     pygame.display.set_caption("mythm")
     font = pygame.font.SysFont("Arial", 22)
     big = pygame.font.SysFont("Arial", 30)
     center_font = pygame.font.SysFont("Arial", 64)
-    clock = pygame.time.Clock()
+    song_clock = SongClock()
+    prof.budget_ms = pacer.budget_ms
+    dirty = DirtyRects((W, H)) if dirty_rects else None
+
+    def blit(surf, pos):
+        rect = screen.blit(surf, pos)
+        if dirty is not None:
+            dirty.add(rect)
 
     # SFX
     tap_sfx_on = True
@@ -97,12 +95,20 @@ def main():
         tap_sfx = None
         print("Tap SFX load failed:", tap_sfx, "|", repr(e))
 
-    song_list = list_songs()
+    library = Library()
+    song_list = library.songs()
+    if song_list:
+        # show the index right away, pick up changes when the scan finishes
+        library.rescan_async()
+    else:
+        library.rescan()
+        song_list = library.songs()
     if not song_list:
         raise SystemExit("No songs found under songs/<artist>/<song>/")
 
     song_idx = 0
-    cur_artist, cur_song = song_list[song_idx]
+    entry = song_list[song_idx]
+    cur_artist, cur_song = entry.artist, entry.song
 
     # modes
     input_mode = "LR6"  # LANE / LR6
@@ -112,28 +118,27 @@ def main():
 
     KEYMAP, NUMMAP = keymaps_lane_mode(lanes)
     lane_w, x0 = lane_layout_default(lanes)
+    lr6 = lr6_layout(screen.get_size())
 
     # gameplay
     meta = None
-    notes = []
-    active = []
-    ni = 0
-    combo = 0
+    session = GameSession()
+    charts = ChartCache()
+    loader = SongLoader(charts, charts.preview_path)
+    recording = None  # Replay of the current play-through
     offset_ms = 0
+    latency_ms = machine_latency_ms()
+    calib = Calibration()
     status = ""
 
-    fx = FX()
-    flash = HitFlash()
+    def game_now():
+        """Song ms for gameplay and effects (0 until the music starts)."""
+        return song_now_ms(offset_ms, song_clock, latency_ms) if music_started else 0
 
-    # hold support
-    keys_pressed = [False]*6
-    holding = [None]*6  # lane -> note dict or None
+    fx = FX(clock=game_now)
+    flash = HitFlash()
 
     # state machine
-    STATE_SELECT = "SELECT"
-    STATE_COUNTDOWN = "COUNTDOWN"
-    STATE_PLAYING = "PLAYING"
-    STATE_PAUSE_CD = "PAUSE_CD"
     state = STATE_SELECT
 
     # timers
@@ -153,8 +158,11 @@ def main():
         """Loop preview while selecting songs."""
         nonlocal music_started
         stop_music()
-        pygame.mixer.music.load(audio_path(cur_artist, cur_song))
+        path = charts.preview_path(cur_artist, cur_song)
+        # short clip, prefetched by the loader -> plays from memory
+        pygame.mixer.music.load(loader.audio_source(path), os.path.splitext(path)[1][1:])
         pygame.mixer.music.play(loops=-1)
+        song_clock.start()
         music_started = True
 
     def start_countdown():
@@ -166,11 +174,38 @@ def main():
         countdown_until_tick = t + COUNTDOWN_MS
         go_until_tick = 0
 
+    def start_calibration():
+        nonlocal state, music_started
+        finish_recording()
+        stop_music()
+        calib.reset()
+        pygame.mixer.music.load(calib.audio(), "wav")
+        pygame.mixer.music.play()
+        song_clock.start()
+        music_started = True
+        state = STATE_CALIBRATE
+
+    def end_calibration(save):
+        nonlocal state, latency_ms, status
+        lat = calib.result()
+        if save and lat is not None:
+            latency_ms = int(round(lat))
+            save_machine_latency(latency_ms)
+            status = f"Saved latency {latency_ms:+d} ms for this machine."
+        state = STATE_SELECT
+        start_preview()
+
     def start_song_playback():
-        nonlocal state, music_started, go_until_tick
+        nonlocal state, music_started, go_until_tick, recording
         stop_music()
+        recording = Replay({
+            "artist": cur_artist, "song": cur_song,
+            "lanes": 6 if input_mode == "LR6" else lanes, "diff": diff,
+            "input_mode": input_mode, "key_mode": key_mode, "offsetMs": offset_ms, "latencyMs": latency_ms,
+        })
         pygame.mixer.music.load(audio_path(cur_artist, cur_song))
         pygame.mixer.music.play()
+        song_clock.start()
         music_started = True
         go_until_tick = pygame.time.get_ticks() + GO_MS
         state = STATE_PLAYING
@@ -178,37 +213,52 @@ def main():
     def pause_with_resume_countdown():
         nonlocal state, resume_until_tick
         pygame.mixer.music.pause()
+        song_clock.pause()
         state = STATE_PAUSE_CD
         resume_until_tick = pygame.time.get_ticks() + COUNTDOWN_MS
 
     def resume_after_countdown_if_ready():
         nonlocal state, go_until_tick
         pygame.mixer.music.unpause()
+        song_clock.resume()
         go_until_tick = pygame.time.get_ticks() + GO_MS
         state = STATE_PLAYING
 
-    def reload_song_assets():
-        """Load meta/chart and reset gameplay trackers."""
-        nonlocal meta, notes, active, ni, combo, offset_ms, status, holding
-        meta = load_meta(cur_artist, cur_song)
+    def finish_recording():
+        """Save the replay of the play-through that is being left."""
+        nonlocal recording
+        if recording is not None and recording.events:
+            print("Saved replay:", recording.save(recording.default_path()))
+        recording = None
+
+    def apply_song_assets(new_meta, c2, err):
+        """Install meta/chart and reset gameplay trackers."""
+        nonlocal meta, offset_ms, status
+        finish_recording()
+        meta = new_meta
         offset_ms = int(meta.get("offsetMs", 0))
+        session.reset(c2 if c2 is not None else Chart())
+        fx.reset()
+        status = err or f"Loaded {len(session.chart)} notes."
 
+    def reload_song_assets():
+        """Load meta/chart now (from the cache) and reset gameplay trackers."""
+        loader.cancel()
         use_lanes = 6 if input_mode == "LR6" else lanes
-        n2, err = load_chart(cur_artist, cur_song, use_lanes, diff)
-        notes = n2 if n2 is not None else []
-        status = err or f"Loaded {len(notes)} notes."
-        active = []
-        ni = 0
-        combo = 0
-        holding = [None]*6
+        apply_song_assets(*read_song(charts, cur_artist, cur_song, use_lanes, diff))
 
     def set_song_index(new_idx):
-        nonlocal song_idx, cur_artist, cur_song
+        """Switch song without blocking: assets arrive via loader.poll()."""
+        nonlocal song_idx, entry, cur_artist, cur_song, status, music_started
         song_idx = new_idx % len(song_list)
-        cur_artist, cur_song = song_list[song_idx]
-        reload_song_assets()
-        if state == STATE_SELECT:
-            start_preview()
+        entry = song_list[song_idx]
+        cur_artist, cur_song = entry.artist, entry.song
+        finish_recording()
+        stop_music()
+        music_started = False
+        status = "Loading..."
+        neighbours = [(x.artist, x.song) for x in (song_list[song_idx - 1], song_list[(song_idx + 1) % len(song_list)])]
+        loader.request(cur_artist, cur_song, 6 if input_mode == "LR6" else lanes, diff, neighbours)
 
     def lane_keys_mapping():
         if input_mode == "LR6":
@@ -225,67 +275,26 @@ def main():
         if tap_sfx_on and tap_sfx is not None:
             tap_sfx.play()
 
-    # initial load + preview
-    reload_song_assets()
-    start_preview()
+    # initial load; meta, chart and preview arrive via loader.poll()
+    set_song_index(song_idx)
 
     key_down_until = [0]*6
 
     running = True
     while running:
+        prof.begin()
         t = pygame.time.get_ticks()
-        now = song_now_ms(offset_ms) if music_started else 0
+        now = game_now()
 
         # spawn only while playing
-        if state == STATE_PLAYING and notes:
-            while ni < len(notes) and now >= notes[ni]["tMs"] - SPAWN_TIME:
-                n = dict(notes[ni])
-                n["hit"] = False
-                # default type is tap
-                n["type"] = n.get("type", "tap")
-                if n["type"] == "hold":
-                    n["durMs"] = int(n.get("durMs", 500))
-                active.append(n)
-                ni += 1
-
-        # auto miss (tap + hold start missed)
-        if state == STATE_PLAYING and notes:
-            for n in active:
-                if n["hit"]:
-                    continue
-                # for hold: if you didn't start it in time, miss
-                if now - n["tMs"] > MISS_AT and (n.get("type","tap") == "tap" or not n.get("hold_started", False)):
-                    n["hit"] = True
-                    combo = 0
-                    fx.show_center("MISS", (255, 90, 90), now)
-                    fx.shake_miss(now)
-
-        # hold processing (must stay pressed until end)
         if state == STATE_PLAYING:
-            for lane, hn in enumerate(holding):
-                if not hn:
-                    continue
-                end_t = hn["tMs"] + int(hn.get("durMs", 500))
-                # release early -> miss
-                if not keys_pressed[lane] and now < end_t - 30:
-                    hn["hit"] = True
-                    holding[lane] = None
-                    combo = 0
-                    fx.show_center("MISS", (255, 90, 90), now)
-                    fx.shake_miss(now)
-                    continue
-                # success
-                if now >= end_t:
-                    hn["hit"] = True
-                    holding[lane] = None
-                    combo += 1
-                    fx.show_center("PERFECT", (160, 220, 255), now)
-                    hx, hy = lr6_hit_xy_for_lane(lane) if input_mode == "LR6" else (lane_center_x(x0, lane_w, lane), JUDGE_Y)
-                    flash.add(hx, hy, now, (160, 220, 255))
-                    play_tap_sfx()
-
-        # events
-        for e in pygame.event.get():
+            session.spawn(now)
+        prof.mark("spawn")
+
+        # events (judged at their own timestamp, not at frame time)
+        for e_perf, e in poller.drain():
+            e_now = int(song_clock.at(e_perf)) + offset_ms - latency_ms if music_started else now
+
             if e.type == pygame.QUIT:
                 running = False
                 break
@@ -296,12 +305,28 @@ def main():
                     break
 
                 # global toggles
+                if e.key == pygame.K_F9:
+                    prof.toggle_overlay()
                 if e.key == pygame.K_m:
                     tap_sfx_on = not tap_sfx_on
                     fx.show_center("SFX ON" if tap_sfx_on else "SFX OFF", (220,220,255), now, dur=420)
 
+                # calibration: taps are judged on the raw clock (no offsets)
+                if state == STATE_CALIBRATE:
+                    if e.key == pygame.K_RETURN:
+                        end_calibration(save=True)
+                    elif e.key == pygame.K_BACKSPACE:
+                        end_calibration(save=False)
+                    elif e.key == pygame.K_SPACE or lane_from_key(e.key) is not None:
+                        calib.tap(song_clock.at(e_perf))
+                        play_tap_sfx()
+                    continue
+
                 # SELECT navigation
                 if state == STATE_SELECT:
+                    if e.key == pygame.K_c:
+                        start_calibration()
+                        continue
                     if e.key == pygame.K_LEFT:
                         set_song_index(song_idx - 1)
                     elif e.key == pygame.K_RIGHT:
@@ -367,7 +392,7 @@ def main():
                         continue
 
                 # hit input (PLAYING only)
-                if state != STATE_PLAYING:
+                if not forwards_lane_key(state, True):
                     continue
 
                 lane = lane_from_key(e.key)
@@ -377,61 +402,19 @@ def main():
                 if lane < 0 or lane > 5:
                     continue
 
-                keys_pressed[lane] = True
-                key_down_until[lane] = now + KEY_HOLD_MS
-
-                # already holding -> ignore new start
-                if holding[lane] is not None:
-                    continue
-
-                # candidate notes in window (fix "tap not registering")
-                cand = [
-                    n for n in active
-                    if (not n["hit"])
-                    and int(n.get("lane", 0)) == lane
-                    and abs(now - n["tMs"]) <= GREAT
-                ]
-                if not cand:
-                    fx.show_center("MISS", (255, 90, 90), now)
-                    fx.shake_miss(now)
-                    combo = 0
-                    continue
-
-                n = min(cand, key=lambda x: abs(now - x["tMs"]))
-                res, err = judge(now, n["tMs"])
-
-                if res in ("S.PERFECT", "PERFECT", "GREAT"):
-                    col = (120,255,160) if res == "S.PERFECT" else ((160,220,255) if res == "PERFECT" else (255,220,160))
-
-                    if n.get("type","tap") == "hold":
-                        # start holding; do not score until end
-                        n["hold_started"] = True
-                        holding[lane] = n
-                        fx.show_center("HOLD", (200,255,220), now, dur=240)
-                        # flash small on start
-                        hx, hy = lr6_hit_xy_for_lane(lane) if input_mode == "LR6" else (lane_center_x(x0, lane_w, lane), JUDGE_Y)
-                        flash.add(hx, hy, now, (200,255,220), dur=140)
-                        play_tap_sfx()
-                    else:
-                        n["hit"] = True
-                        combo += 1
-                        fx.show_center(res, col, now)
-                        hx, hy = lr6_hit_xy_for_lane(lane) if input_mode == "LR6" else (lane_center_x(x0, lane_w, lane), JUDGE_Y)
-                        flash.add(hx, hy, now, col)
-                        play_tap_sfx()
-
-                elif res == "MISS":
-                    n["hit"] = True
-                    combo = 0
-                    fx.show_center("MISS", (255, 90, 90), now)
-                    fx.shake_miss(now)
+                key_down_until[lane] = e_now + KEY_HOLD_MS
+                session.press(lane, e_now)
+                if recording is not None:
+                    recording.record(e_now, lane, True)
 
             if e.type == pygame.KEYUP:
                 lane = lane_from_key(e.key)
                 if lane is not None:
                     lane = int(lane)
-                    if 0 <= lane <= 5:
-                        keys_pressed[lane] = False
+                    if 0 <= lane <= 5 and forwards_lane_key(state, False):
+                        session.release(lane, e_now)
+                        if recording is not None:
+                            recording.record(e_now, lane, False)
 
             if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
                 if state == STATE_SELECT:
@@ -441,6 +424,61 @@ def main():
                         tap_sfx_on = not tap_sfx_on
                 # no mouse actions during play
 
+        prof.mark("events")
+
+        # auto miss, hold completion, expiry
+        if state == STATE_PLAYING:
+            session.auto_miss(now)
+        prof.mark("auto_miss")
+        if state == STATE_PLAYING:
+            session.update_holds(now)
+        prof.mark("holds")
+
+        # judgement feedback
+        for kind, lane, ev_t, res, d in session.events:
+            if kind == EV_MISS:
+                fx.show_center("MISS", (255, 90, 90), ev_t)
+                fx.shake_miss(ev_t)
+                continue
+            hx, hy = lr6.targets[lane] if input_mode == "LR6" else (lane_center_x(x0, lane_w, lane), JUDGE_Y)
+            if kind == EV_HOLD_START:
+                fx.show_center("HOLD", (200,255,220), ev_t, dur=240)
+                # flash small on start
+                flash.add(hx, hy, ev_t, (200,255,220), dur=140)
+                play_tap_sfx()
+            elif kind == EV_HOLD_DONE:
+                fx.show_center("PERFECT", (160, 220, 255), ev_t)
+                flash.add(hx, hy, ev_t, (160, 220, 255))
+                fx.burst(hx, hy, (160, 220, 255), ev_t)
+                play_tap_sfx()
+            elif kind == EV_HIT:
+                col = (120,255,160) if res == "S.PERFECT" else ((160,220,255) if res == "PERFECT" else (255,220,160))
+                fx.show_center(res, col, ev_t)
+                flash.add(hx, hy, ev_t, col)
+                fx.burst(hx, hy, col, ev_t)
+                play_tap_sfx()
+        session.events.clear()
+
+        # async song switch finished (stale loads never show up here)
+        loaded = loader.poll()
+        if loaded is not None and state == STATE_SELECT and (loaded.artist, loaded.song) == (cur_artist, cur_song):
+            apply_song_assets(loaded.meta, loaded.chart, loaded.err)
+            if loaded.preview is not None:
+                start_preview()
+
+        # library rescan finished: swap in the new list, keep the selection
+        if library.changed.is_set():
+            library.changed.clear()
+            new_list = library.songs()
+            if new_list:
+                keys = [(x.artist, x.song) for x in new_list]
+                song_list = new_list
+                if (cur_artist, cur_song) in keys:
+                    song_idx = keys.index((cur_artist, cur_song))
+                    entry = song_list[song_idx]
+                elif state == STATE_SELECT:
+                    set_song_index(min(song_idx, len(song_list) - 1))
+
         # state transitions
         if state == STATE_COUNTDOWN:
             if pygame.time.get_ticks() >= countdown_until_tick:
@@ -448,16 +486,22 @@ def main():
                 reload_song_assets()
                 start_song_playback()
 
+        if state == STATE_CALIBRATE and song_clock.now() >= calib.end_ms() + 1000:
+            end_calibration(save=calib.est.settled())
+
         if state == STATE_PAUSE_CD:
             if pygame.time.get_ticks() >= resume_until_tick:
                 resume_after_countdown_if_ready()
 
-        # cleanup old notes
-        if state == STATE_PLAYING:
-            active = [n for n in active if now - n["tMs"] <= 2000]
+        prof.mark("feedback")
 
         # ---------- DRAW ----------
-        screen.fill((20, 20, 30))
+        # gameplay renderers start with an opaque cached layer, no fill needed
+        if state in (STATE_SELECT, STATE_CALIBRATE):
+            if dirty is None:
+                screen.fill(BG)
+            else:
+                dirty.restore(screen, BG)
 
         # camera shake
         ox, oy = fx.cam(now)
@@ -465,25 +509,41 @@ def main():
         # select screen
         if state == STATE_SELECT:
             # title
-            title =  cur_song
-            artist =  cur_artist
-            screen.blit(big.render(f"[{song_idx+1}/{len(song_list)}] {title} - {artist}", True, (255,255,255)), (20, 18))
-            screen.blit(font.render("←/→ choose song | ENTER or PLAY to start | SHIFT+1/2/3 diff | F4 mode | M toggle sfx", True, (200,200,210)), (20, 52))
+            title = entry.title
+            artist = entry.song_artist
+            blit(render_text(big, f"[{song_idx+1}/{len(song_list)}] {title} - {artist}", (255,255,255)), (20, 18))
+            blit(render_text(font, "←/→ choose song | ENTER or PLAY to start | SHIFT+1/2/3 diff | F4 mode | M sfx | C calibrate", (200,200,210)), (20, 52))
 
             # buttons
-            draw_button(screen, play_btn, "PLAY", big)
-            draw_button(screen, sfx_btn, f"SFX {'ON' if tap_sfx_on else 'OFF'}", font)
+            for r in (draw_button(screen, play_btn, "PLAY", big),
+                      draw_button(screen, sfx_btn, f"SFX {'ON' if tap_sfx_on else 'OFF'}", font)):
+                if dirty is not None:
+                    dirty.add(r)
 
             # hint current mode
             mode_txt = f"MODE={input_mode}" + (f" | lanes={lanes} key={key_mode}" if input_mode == "LANE" else " | LR6 keys: 1 4 7 | 3 6 9")
-            screen.blit(font.render(mode_txt, True, (255,200,120)), (20, 86))
+            variant = f"{6 if input_mode == 'LR6' else lanes}_{diff}"
+            mode_txt += f" | BPM {entry.bpm or '?'} | chart {variant} {'OK' if variant in entry.charts else 'missing'}"
+            blit(render_text(font, mode_txt, (255,200,120)), (20, 86))
+            blit(render_text(font, f"latency {latency_ms:+d} ms", (180,180,255)), (20, 120))
+            if status:
+                blit(render_text(font, status, (180,180,255)), (20, 148))
+            prof.mark("render")
+
+        elif state == STATE_CALIBRATE:
+            rects = calib.draw(screen, font, big, song_clock.now())
+            if dirty is not None:
+                dirty.extend(rects)
+            prof.mark("render")
 
         else:
             # gameplay draw
             if input_mode == "LR6":
-                render_lr6_beatup_ui(screen, active, now, key_down_until, font, flash)
+                render_lr6_beatup_ui(screen, session.window, now, key_down_until, font, flash, dirty)
             else:
-                render_multilane(screen, active, now, lanes, lane_w, x0, key_mode, key_down_until[:lanes], font)
+                render_multilane(screen, session.window, now, lanes, lane_w, x0, key_mode, key_down_until[:lanes], font, dirty)
+            prof.mark("render")
+            fx.draw(screen, now, dirty)
 
             # center messages + shake already
             # center text from fx
@@ -494,40 +554,53 @@ def main():
                     fx.center_text = None
                 else:
                     alpha = int(255*(1-tt))
-                    s = center_font.render(text, True, col)
-                    s.set_alpha(alpha)
-                    screen.blit(s, (W//2 - s.get_width()//2 + ox, H//2 - s.get_height()//2 + oy))
+                    s = render_text(center_font, text, col)
+                    rect = blit_alpha(screen, s, (W//2 - s.get_width()//2 + ox, H//2 - s.get_height()//2 + oy), alpha)
+                    if dirty is not None:
+                        dirty.add(rect)
 
             # countdown overlays
             if state == STATE_COUNTDOWN:
                 remain = max(0, countdown_until_tick - pygame.time.get_ticks())
                 num = 1 + (remain // 1000)
-                s = center_font.render(str(int(num)), True, (255,255,255))
-                screen.blit(s, (W//2 - s.get_width()//2, H//2 - s.get_height()//2))
+                s = render_text(center_font, str(int(num)), (255,255,255))
+                blit(s, (W//2 - s.get_width()//2, H//2 - s.get_height()//2))
 
             if state == STATE_PAUSE_CD:
                 remain = max(0, resume_until_tick - pygame.time.get_ticks())
                 num = 1 + (remain // 1000)
-                s = center_font.render(str(int(num)), True, (255,255,255))
-                screen.blit(s, (W//2 - s.get_width()//2, H//2 - s.get_height()//2))
-                pause_txt = font.render("PAUSED", True, (255, 220, 160))
-                screen.blit(pause_txt, (W//2 - pause_txt.get_width()//2, 36))
+                s = render_text(center_font, str(int(num)), (255,255,255))
+                blit(s, (W//2 - s.get_width()//2, H//2 - s.get_height()//2))
+                pause_txt = render_text(font, "PAUSED", (255, 220, 160))
+                blit(pause_txt, (W//2 - pause_txt.get_width()//2, 36))
 
             if go_until_tick and pygame.time.get_ticks() < go_until_tick:
-                s = center_font.render("GO", True, (200,255,200))
-                screen.blit(s, (W//2 - s.get_width()//2, H//2 - s.get_height()//2))
+                s = render_text(center_font, "GO", (200,255,200))
+                blit(s, (W//2 - s.get_width()//2, H//2 - s.get_height()//2))
 
             # HUD
-            title = cur_song
-            artist = cur_artist
-            screen.blit(big.render(f"{title} - {artist}", True, (255,255,255)), (20+ox, 12+oy))
-            screen.blit(font.render(f"diff={diff.upper()} | Combo={combo} | offsetMs={offset_ms} | SFX={'ON' if tap_sfx_on else 'OFF'} | P pause", True, (255,200,120)), (20+ox, 44+oy))
+            title = entry.title
+            artist = entry.song_artist
+            blit(render_text(big, f"{title} - {artist}", (255,255,255)), (20+ox, 12+oy))
+            blit(render_text(font, f"diff={diff.upper()} | Combo={session.combo} | offsetMs={offset_ms} latency={latency_ms} | SFX={'ON' if tap_sfx_on else 'OFF'} | P pause", (255,200,120)), (20+ox, 44+oy))
             if status:
-                screen.blit(font.render(status, True, (180,180,255)), (20+ox, 72+oy))
+                blit(render_text(font, status, (180,180,255)), (20+ox, 72+oy))
 
-        pygame.display.flip()
-        clock.tick(60)
+        prof.mark("fx_text")
+        rect = prof.draw(screen, font)
+        prof.mark("overlay")
 
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            dirty.add(rect)
+            dirty.present()
+        prof.mark("flip")
+        prof.end()
+        pacer.wait()
+
+    finish_recording()
+    print("Song clock:", song_clock.stats())
     pygame.quit()
 
 if __name__ == "__main__":
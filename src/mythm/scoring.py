@@ -0,0 +1,227 @@
+"""Vectorised batch re-scoring of recorded hits under any judge windows.
+
+`judge.judge` classifies one hit at a time; here whole arrays (hundreds of
+thousands of notes across many sessions) are classified, combo-counted
+and histogrammed with NumPy in one pass, so window tuning can be tried
+without re-simulating anything.
+
+A "hit time" of NaN means the note was never pressed (counts as MISS).
+Only tap notes are rescored: a hold's in-game result depends on when it
+is released, not on its head timing, so `arrays_from_replays` drops holds
+(their presses are still matched, so they cannot score a nearby tap).
+Presses that match no note, which the game also counts as MISS, are not
+part of the per-note totals.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from mythm.config import S_PERFECT, PERFECT, GREAT, MISS_AT
+from mythm.notes import HOLD
+
+JudgeWindows = namedtuple("JudgeWindows", "s_perfect perfect great miss_at")
+DEFAULT_WINDOWS = JudgeWindows(S_PERFECT, PERFECT, GREAT, MISS_AT)
+
+# result codes, in the order judge.judge tests them
+RESULTS = ("S.PERFECT", "PERFECT", "GREAT", "EARLY", "MISS")
+R_S_PERFECT, R_PERFECT, R_GREAT, R_EARLY, R_MISS = range(5)
+
+# accuracy credit per result code
+DEFAULT_WEIGHTS = (1.0, 0.9, 0.6, 0.0, 0.0)
+
+
+def classify(d, windows=DEFAULT_WINDOWS):
+    """Result codes for timing errors d = hit - note (ms), like judge.judge."""
+    d = np.asarray(d, dtype=np.float64)
+    ad = np.abs(d)
+    codes = np.full(d.shape, R_EARLY, dtype=np.int8)
+    codes[d > windows.miss_at] = R_MISS
+    codes[np.isnan(d)] = R_MISS
+    # tightest window last so it wins
+    codes[ad <= windows.great] = R_GREAT
+    codes[ad <= windows.perfect] = R_PERFECT
+    codes[ad <= windows.s_perfect] = R_S_PERFECT
+    return codes
+
+
+def combo_runs(success, session=None):
+    """Length of every unbroken run of successes (runs also end at session changes).
+
+    Returns (run_lengths, run_session) where run_session is the session id
+    each run belongs to.
+    """
+    success = np.asarray(success, dtype=bool)
+    n = len(success)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    session = np.zeros(n, dtype=np.int64) if session is None else np.asarray(session)
+    new_session = np.empty(n, dtype=bool)
+    new_session[0] = True
+    new_session[1:] = session[1:] != session[:-1]
+    # a failure or a session start opens a new group; failures add nothing to it
+    group = np.cumsum(~success | new_session) - 1
+    runs = np.bincount(group, weights=success).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    return runs, session[starts]
+
+
+def rescore(note_t, hit_t, session=None, windows=DEFAULT_WINDOWS,
+            weights=DEFAULT_WEIGHTS, bin_ms=5):
+    """Judge every (note, hit) pair and summarise.
+
+    `session` (optional, same length) tags each note with its session so
+    combos never run across sessions; notes must be in play order within
+    a session. Returns counts, accuracy, max combo (overall and per
+    session) and a histogram of timing errors of all pressed notes.
+    """
+    note_t = np.asarray(note_t, dtype=np.float64)
+    hit_t = np.asarray(hit_t, dtype=np.float64)
+    d = hit_t - note_t
+    codes = classify(d, windows)
+
+    counts = np.bincount(codes, minlength=len(RESULTS))
+    credit = np.asarray(weights, dtype=np.float64)[codes]
+    runs, run_session = combo_runs(codes <= R_GREAT, session)
+
+    pressed = ~np.isnan(d)
+    edges = np.arange(-windows.miss_at, windows.miss_at + bin_ms, bin_ms, dtype=np.float64)
+    hist, edges = np.histogram(d[pressed], bins=edges)
+
+    out = {
+        "windows": windows._asdict(),
+        "notes": int(len(codes)),
+        "counts": {r: int(c) for r, c in zip(RESULTS, counts)},
+        "accuracy": float(credit.mean()) if len(credit) else 0.0,
+        "max_combo": int(runs.max()) if len(runs) else 0,
+        "mean_error_ms": float(d[pressed].mean()) if pressed.any() else 0.0,
+        "std_error_ms": float(d[pressed].std()) if pressed.any() else 0.0,
+        "histogram": (hist, edges),
+    }
+    if session is not None:
+        session = np.asarray(session)
+        ids, inv = np.unique(session, return_inverse=True)
+        per_acc = np.bincount(inv, weights=credit) / np.bincount(inv)
+        per_combo = np.zeros(len(ids), dtype=np.int64)
+        np.maximum.at(per_combo, np.searchsorted(ids, run_session), runs)
+        out["sessions"] = {
+            "ids": ids,
+            "accuracy": per_acc,
+            "max_combo": per_combo,
+        }
+    return out
+
+
+def compare_windows(note_t, hit_t, window_sets, session=None, **kw):
+    """rescore() for several candidate window sets; returns a list of results.
+
+    `hit_t` is shared, so it must have been paired at least as wide as the
+    widest `great` in `window_sets` (see match_hits); `main` pairs per set.
+    """
+    return [rescore(note_t, hit_t, session, windows=w, **kw) for w in window_sets]
+
+
+def match_hits(chart, events, max_ms=GREAT):
+    """Hit time per note from recorded (t_ms, lane, down) inputs, as the game pairs them.
+
+    Presses are taken in time order and each one consumes the closest
+    unhit note in its lane within `max_ms` (earliest wins a tie), like
+    `LaneIndex.candidate`; a press that starts a hold blocks its lane
+    until the release or the hold's end, as `GameSession.press` does.
+    Unmatched notes get NaN. This pairing is a plain loop: consumption
+    makes it sequential, and it is cheap next to the rescoring itself.
+    """
+    n = len(chart)
+    hit = np.full(n, np.nan)
+    taken = bytearray(n)
+    t_ms, lane_of, kind = chart.t_ms, chart.lane, chart.kind
+    lanes = [[] for _ in range(6)]            # note indices per lane, in time order
+    for i in range(n):
+        lanes[lane_of[i]].append(i)
+    lo = [0] * 6                              # first note a later press can still reach
+    holding_until = [None] * 6
+    for t, lane, down in events:
+        if not down:
+            holding_until[lane] = None
+            continue
+        if holding_until[lane] is not None and t < holding_until[lane]:
+            continue
+        holding_until[lane] = None
+        q = lanes[lane]
+        k = lo[lane]
+        while k < len(q) and (t_ms[q[k]] < t - max_ms or taken[q[k]]):
+            k += 1
+        lo[lane] = k
+        best, best_d = None, float("inf")
+        while k < len(q) and t_ms[q[k]] <= t + max_ms:
+            i = q[k]
+            if not taken[i] and abs(t - t_ms[i]) < best_d:
+                best, best_d = i, abs(t - t_ms[i])
+            k += 1
+        if best is not None:
+            taken[best] = 1
+            hit[best] = t
+            if kind[best] == HOLD:
+                holding_until[lane] = chart.end_ms(best)
+    return hit
+
+
+def load_replays(paths):
+    """[(chart, events)] for the replay files whose chart can be loaded."""
+    from mythm.replay import Replay
+    from mythm.songs import load_chart
+
+    out = []
+    for path in paths:
+        rp = Replay.load(path)
+        i = rp.info
+        chart, err = load_chart(i["artist"], i["song"], int(i["lanes"]), i["diff"])
+        if chart is None:
+            print("Skipping", path, "|", err)
+            continue
+        out.append((chart, rp.events))
+    return out
+
+
+def arrays_from_replays(replays, max_ms=GREAT):
+    """(note_t, hit_t, session) of tap notes over load_replays() output, one session per replay.
+
+    Presses are paired with notes within `max_ms`, which should be the
+    `great` window of the set being scored: the game only takes a press
+    for a note within GREAT.
+    """
+    note_ts, hit_ts, sess = [], [], []
+    for k, (chart, events) in enumerate(replays):
+        hit = match_hits(chart, events, max_ms)
+        taps = np.frombuffer(chart.kind, dtype=np.int8) != HOLD
+        nt = np.frombuffer(chart.t_ms, dtype=np.int32).astype(np.float64)[taps]
+        note_ts.append(nt)
+        hit_ts.append(hit[taps])
+        sess.append(np.full(len(nt), k, dtype=np.int64))
+    if not note_ts:
+        empty = np.zeros(0)
+        return empty, empty, empty.astype(np.int64)
+    return np.concatenate(note_ts), np.concatenate(hit_ts), np.concatenate(sess)
+
+
+def parse_windows(spec):
+    """'22,45,95,140' -> JudgeWindows."""
+    parts = [float(x) for x in spec.split(",")]
+    if len(parts) != 4:
+        raise ValueError(f"Need 4 windows (s_perfect,perfect,great,miss_at), got {spec!r}")
+    return JudgeWindows(*parts)
+
+
+def main(paths, window_specs=()):
+    replays = load_replays(list(paths))
+    sets = [DEFAULT_WINDOWS] + [parse_windows(s) for s in window_specs]
+    for windows in sets:
+        # pair presses per set: a wider GREAT can take presses the default cannot
+        note_t, hit_t, session = arrays_from_replays(replays, windows.great)
+        if windows is sets[0]:
+            print(f"{len(note_t)} notes from {len(replays)} replays")
+        r = rescore(note_t, hit_t, session, windows=windows)
+        w = r["windows"]
+        print(f"windows {w['s_perfect']:g}/{w['perfect']:g}/{w['great']:g}/{w['miss_at']:g}:",
+              " ".join(f"{k}={v}" for k, v in r["counts"].items()),
+              f"acc={r['accuracy'] * 100:.2f}% max_combo={r['max_combo']}",
+              f"err={r['mean_error_ms']:+.1f}±{r['std_error_ms']:.1f}ms")
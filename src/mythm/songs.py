@@ -0,0 +1,109 @@
+import os
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from mythm.notes import Chart
+
+# ---------------- Song FS ----------------
+def song_base(a, s): return os.path.join("songs", a, s)
+def meta_path(a, s): return os.path.join(song_base(a, s), "meta.json")
+def audio_path(a, s): return os.path.join(song_base(a, s), "song.wav")
+
+def chart_path(a, s, lanes, diff):
+    return os.path.join(song_base(a, s), "charts", f"{lanes}_{diff}.json")
+
+def load_meta(a, s):
+    return json.load(open(meta_path(a, s), encoding="utf-8"))
+
+def load_chart(a, s, lanes, diff):
+    p = chart_path(a, s, lanes, diff)
+    if not os.path.exists(p):
+        return None, f"Missing chart: {p}"
+    j = json.load(open(p, encoding="utf-8"))
+    chart = Chart.from_notes(j.get("notes", []))
+    if len(chart) == 0:
+        return chart, "Chart has 0 notes (regen needed)."
+    return chart, None
+
+# ---------------- Cache ----------------
+LANE_VARIANTS = (5, 6)
+DIFFS = ("easy", "normal", "hard")
+
+
+def _mtime(p):
+    try:
+        return os.stat(p).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ChartCache:
+    """LRU of parsed charts keyed by (artist, song, lanes, diff), plus metas.
+
+    Entries remember the file mtime they were parsed from and are re-read
+    only when it changes; the mtime itself is re-checked at most once per
+    `revalidate_s`, so toggles and retries normally touch no files at all.
+    Safe to share between threads; `SongLoader` warms it in the background.
+    """
+
+    def __init__(self, maxsize=64, revalidate_s=2.0):
+        self.maxsize = maxsize
+        self.revalidate_s = revalidate_s
+        self._charts = OrderedDict()  # key -> [mtime, checked_at, chart, err]
+        self._metas = OrderedDict()   # (artist, song) -> [mtime, checked_at, meta]
+        self._lock = threading.Lock()
+
+    def _lookup(self, table, key, path):
+        with self._lock:
+            ent = table.get(key)
+            if ent is None:
+                return None
+            table.move_to_end(key)
+        now = time.monotonic()
+        if now - ent[1] >= self.revalidate_s:
+            if _mtime(path) != ent[0]:
+                return None
+            ent[1] = now
+        return ent
+
+    def _store(self, table, key, ent):
+        with self._lock:
+            table[key] = ent
+            table.move_to_end(key)
+            while len(table) > self.maxsize:
+                table.popitem(last=False)
+
+    def meta(self, a, s):
+        p = meta_path(a, s)
+        ent = self._lookup(self._metas, (a, s), p)
+        if ent is None:
+            mt = _mtime(p)
+            ent = [mt, time.monotonic(), load_meta(a, s)]
+            self._store(self._metas, (a, s), ent)
+        return ent[2]
+
+    def chart(self, a, s, lanes, diff):
+        """Same contract as load_chart: (Chart or None, error or None)."""
+        key = (a, s, lanes, diff)
+        p = chart_path(a, s, lanes, diff)
+        ent = self._lookup(self._charts, key, p)
+        if ent is None:
+            mt = _mtime(p)
+            chart, err = load_chart(a, s, lanes, diff)
+            ent = [mt, time.monotonic(), chart, err]
+            self._store(self._charts, key, ent)
+        return ent[2], ent[3]
+
+    def preview_path(self, a, s):
+        """Short pre-encoded preview clip if the song has one, else song.wav."""
+        try:
+            clip = self.meta(a, s).get("previewFile")
+        except (OSError, ValueError):
+            clip = None
+        if clip:
+            p = os.path.join(song_base(a, s), clip)
+            if os.path.exists(p):
+                return p
+        return audio_path(a, s)
@@ -0,0 +1,54 @@
+"""Rendered text surfaces, cached by (font, text, colour).
+
+HUD lines, titles, countdown digits and judgement words repeat frame
+after frame; rasterising them with `font.render` each time showed up in
+the profile. `render_text` returns the cached surface (LRU-bounded) and
+`blit_alpha` fades one at blit time, so the fading centre text reuses a
+single surface instead of rendering a copy per alpha.
+"""
+from collections import OrderedDict
+
+
+class TextCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._surfs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surf = self._surfs.get(key)
+        if surf is not None:
+            self._surfs.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = self._surfs[key] = font.render(text, antialias, color)
+        if len(self._surfs) > self.maxsize:
+            self._surfs.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._surfs.clear()
+
+
+TEXT = TextCache()
+
+
+def render_text(font, text, color):
+    """Like font.render(text, True, color), from the shared cache.
+
+    The surface is shared: do not draw on it; fade it with blit_alpha.
+    """
+    return TEXT.render(font, text, color)
+
+
+def blit_alpha(screen, surf, pos, alpha):
+    """Blit a (cached) surface at the given alpha without changing it for others."""
+    if alpha >= 255:
+        return screen.blit(surf, pos)
+    surf.set_alpha(max(0, int(alpha)))
+    rect = screen.blit(surf, pos)
+    surf.set_alpha(255)
+    return rect
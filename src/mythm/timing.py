@@ -0,0 +1,137 @@
+import time
+from collections import deque
+
+import pygame
+
+
+class _Jitter:
+    """Running mean / std of per-reading clock error (Welford)."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+
+    def add(self, x):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+
+    def std(self):
+        return (self.m2 / (self.n - 1)) ** 0.5 if self.n > 1 else 0.0
+
+
+class SongClock:
+    """Song position in ms, interpolated between mixer position updates.
+
+    `pygame.mixer.music.get_pos()` only moves once per audio buffer (2048
+    samples ~ 46 ms at 44.1 kHz). Between updates the position is
+    extrapolated with `time.perf_counter()`; each new mixer reading nudges
+    the anchor by a fraction of the error (`gain`) instead of jumping, and
+    only errors above `snap_ms` (seek, restart, stall) re-anchor outright.
+    """
+
+    def __init__(self, source=None, perf=time.perf_counter, gain=0.1, snap_ms=120):
+        self.source = source or pygame.mixer.music.get_pos
+        self.perf = perf
+        self.gain = gain
+        self.snap_ms = snap_ms
+        self.start()
+
+    def start(self, pos_ms=0.0):
+        """(Re)anchor at pos_ms; call right after music.play()."""
+        self.anchor_ms = float(pos_ms)
+        self.anchor_perf = self.perf()
+        self.last_raw = None
+        self.last_out = float(pos_ms)
+        self.paused = False
+        self.snaps = 0
+        self.raw_jitter = _Jitter()
+        self.out_jitter = _Jitter()
+        self._prev = None  # (perf, raw, out) of the previous now() call
+
+    def pause(self):
+        if not self.paused:
+            self.last_out = self.now()
+            self.paused = True
+
+    def resume(self):
+        """Continue from the paused position; call right after music.unpause()."""
+        if self.paused:
+            self.paused = False
+            self.anchor_ms = self.last_out
+            self.anchor_perf = self.perf()
+            self.last_raw = self.source()
+            self._prev = None
+
+    def at(self, perf_s):
+        """Song ms at a perf_counter() stamp (e.g. an input event)."""
+        if self.paused:
+            return self.last_out
+        return self.anchor_ms + (perf_s - self.anchor_perf) * 1000.0
+
+    def now(self):
+        if self.paused:
+            return self.last_out
+        perf = self.perf()
+        raw = self.source()
+        pred = self.at(perf)
+        if raw >= 0 and raw != self.last_raw:
+            err = raw - pred
+            if abs(err) > self.snap_ms:
+                self.anchor_ms, self.anchor_perf = float(raw), perf
+                self.last_out = float(raw)
+                self.snaps += 1
+            else:
+                self.anchor_ms += err * self.gain
+            self.last_raw = raw
+            pred = self.at(perf)
+        # never run backwards because of a correction
+        out = max(pred, self.last_out)
+        self._track(perf, raw, out)
+        self.last_out = out
+        return out
+
+    def _track(self, perf, raw, out):
+        prev = self._prev
+        if prev is not None and raw >= 0 and prev[1] >= 0:
+            wall = (perf - prev[0]) * 1000.0
+            self.raw_jitter.add((raw - prev[1]) - wall)
+            self.out_jitter.add((out - prev[2]) - wall)
+        self._prev = (perf, raw, out)
+
+    def stats(self):
+        """Per-reading step error vs wall time, raw mixer vs smoothed (ms)."""
+        return {
+            "samples": self.out_jitter.n,
+            "raw_jitter_ms": round(self.raw_jitter.std(), 3),
+            "smoothed_jitter_ms": round(self.out_jitter.std(), 3),
+            "snaps": self.snaps,
+        }
+
+
+class InputPoller:
+    """Drain pygame events and stamp each one with `time.perf_counter()`.
+
+    pygame events carry no timestamp of their own, so the stamp is the
+    moment the event left the SDL queue. With `poll_hz` > 0 the frame
+    pacer keeps pumping the queue while it waits for the next frame, so
+    a stamp is at most 1/poll_hz late instead of up to a whole frame.
+    """
+
+    def __init__(self, poll_hz=0):
+        self.poll_hz = poll_hz
+        self.queue = deque()  # (perf_s, event)
+
+    def poll(self):
+        t = time.perf_counter()
+        for e in pygame.event.get():
+            self.queue.append((t, e))
+
+    def drain(self):
+        """Yield (perf_s, event) for everything received so far, oldest first."""
+        self.poll()
+        q = self.queue
+        while q:
+            yield q.popleft()
@@ -1,19 +1,9 @@
 import os, sys, json, random
 import numpy as np
 import librosa
+from mythm.tools.make_chart import SR, HOP, song_features
 
-SR = 44100
-HOP = 512
-
-def smooth(x, w=7):
-    if len(x) < w: return x
-    return np.convolve(x, np.ones(w)/w, mode="same")
-
-def norm01(x):
-    x = np.asarray(x)
-    return (x - x.min()) / (x.max() + 1e-9)
-
-def build_vocal_first(y, sr, lanes, diff):
+def build_vocal_first(feats, lanes, diff):
     # ✅ เพิ่มความหนาแน่น (สำคัญ)
     if diff == "easy":
         min_gap_ms = 165
@@ -37,18 +27,11 @@ def build_vocal_first(y, sr, lanes, diff):
         base_delta = 0.11
         chorus_extra_prob = 0.20
 
-
-    y_h, y_p = librosa.effects.hpss(y)
-
-    # vocal-ish onset envelope (median aggregate helps syllables)
-    onset_v = librosa.onset.onset_strength(y=y_h, sr=sr, aggregate=np.median)
-    onset_v = norm01(smooth(onset_v, 7))
-
-    # energy for chorus detection
-    rms = norm01(smooth(librosa.feature.rms(y=y, hop_length=HOP)[0], 21))
+    # vocal-ish onset envelope (median aggregate on the harmonic part helps
+    # syllables) and energy, computed once per song by song_features
+    sr, duration_s, onset_v, rms = feats
     chorus_thr = float(np.percentile(rms, 60))  # top ~40% energy = chorus-ish
 
-    duration_s = len(y) / sr
     target = max(160, int(target_npm * (duration_s / 60.0)))  # ✅ เป้าขั้นต่ำต่อเพลง
 
     min_gap_frames = int((min_gap_ms/1000) * sr / HOP)
@@ -145,11 +128,13 @@ def main(song_dir: str):
     meta = json.load(open(meta_path, encoding="utf-8"))
     y, sr = librosa.load(wav_path, sr=SR, mono=True)
 
+    feats = song_features(y, sr)
+
     random.seed(7)
 
     for lanes in (5, 6):
         for diff in ("easy", "normal", "hard"):
-            notes = build_vocal_first(y, sr, lanes, diff)
+            notes = build_vocal_first(feats, lanes, diff)
             chart = {
                 "title": meta.get("title", os.path.basename(song_dir)),
                 "artist": meta.get("artist", os.path.basename(os.path.dirname(song_dir))),
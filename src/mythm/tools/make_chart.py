@@ -1,4 +1,5 @@
 import os, sys, json, random
+from collections import namedtuple
 import numpy as np
 import librosa
 
@@ -30,7 +31,17 @@ def pick_lane(prev, lanes):
         lane = max(0, min(lanes-1, lane + random.choice([-1, 1])))
     return lane
 
-def build_vocal_first(y, sr, lanes, diff):
+# per-song analysis shared by every lane/difficulty variant (hpss dominates)
+SongFeatures = namedtuple("SongFeatures", "sr duration_s onset rms")
+
+def song_features(y, sr):
+    y_h, _ = librosa.effects.hpss(y)
+    onset = librosa.onset.onset_strength(y=y_h, sr=sr, aggregate=np.median)
+    onset = norm01(smooth(onset, 7))
+    rms = norm01(smooth(librosa.feature.rms(y=y, hop_length=HOP)[0], 21))
+    return SongFeatures(sr, len(y)/sr, onset, rms)
+
+def build_vocal_first(feats, lanes, diff):
     # balanced density (แก้แน่นไป)
     if diff == "easy":
         min_gap_ms = 165; wait = 6; target_npm = 150; thr = 0.16; delta = 0.12; chorus_p = 0.12
@@ -39,13 +50,7 @@ def build_vocal_first(y, sr, lanes, diff):
     else:
         min_gap_ms = 105; wait = 5; target_npm = 280; thr = 0.14; delta = 0.11; chorus_p = 0.20
 
-    duration_s = len(y)/sr
-
-    y_h, _ = librosa.effects.hpss(y)
-    onset = librosa.onset.onset_strength(y=y_h, sr=sr, aggregate=np.median)
-    onset = norm01(smooth(onset, 7))
-
-    rms = norm01(smooth(librosa.feature.rms(y=y, hop_length=HOP)[0], 21))
+    sr, duration_s, onset, rms = feats
     chorus_thr = float(np.percentile(rms, 65))
 
     min_gap_frames = int((min_gap_ms/1000) * sr / HOP)
@@ -106,10 +111,12 @@ def main(song_dir: str | os.PathLike):
     meta = json.load(open(meta_path, encoding="utf-8"))
     y, sr = librosa.load(wav_path, sr=SR, mono=True)
 
+    feats = song_features(y, sr)
+
     random.seed(7)
     for lanes in (5, 6):
         for diff in ("easy", "normal", "hard"):
-            notes = build_vocal_first(y, sr, lanes, diff)
+            notes = build_vocal_first(feats, lanes, diff)
             chart = {
                 "title": meta.get("title", os.path.basename(song_dir)),
                 "artist": meta.get("artist", os.path.basename(os.path.dirname(song_dir))),
@@ -0,0 +1,80 @@
+import os, sys, json
+import numpy as np
+import librosa
+import soundfile as sf
+
+from mythm.tools.make_chart import HOP, smooth, norm01
+
+PREVIEW_FILE = "preview.ogg"
+PREVIEW_S = 15.0
+FADE_IN_S = 0.4
+FADE_OUT_S = 1.5
+PREVIEW_SR = 44100
+
+def find_preview(y, sr, length_s=PREVIEW_S):
+    """(start_s, end_s) of the loudest sustained window (chorus-ish).
+
+    Uses the same smoothed RMS energy curve make_chart uses for chorus
+    detection; the first 10% of the song is skipped so intros never win.
+    """
+    duration_s = len(y) / sr
+    if duration_s <= length_s:
+        return 0.0, duration_s
+    rms = norm01(smooth(librosa.feature.rms(y=y, hop_length=HOP)[0], 21))
+    win = max(1, int(length_s * sr / HOP))
+    csum = np.concatenate(([0.0], np.cumsum(rms)))
+    score = (csum[win:] - csum[:-win]) / win          # mean energy per start frame
+    first = int(0.10 * len(rms))
+    score[:first] = -1
+    start_fr = int(np.argmax(score))
+    start_s = float(librosa.frames_to_time(start_fr, sr=sr, hop_length=HOP))
+    start_s = min(start_s, duration_s - length_s)
+    return start_s, start_s + length_s
+
+def render_clip(wav_path, out_path, start_s, end_s):
+    """Cut [start_s, end_s) from the original file, fade, write OGG Vorbis."""
+    info = sf.info(wav_path)
+    a = int(start_s * info.samplerate)
+    b = int(end_s * info.samplerate)
+    data, sr = sf.read(wav_path, start=a, stop=b, dtype="float32", always_2d=True)
+    n = len(data)
+    fi = min(n, int(FADE_IN_S * sr))
+    fo = min(n, int(FADE_OUT_S * sr))
+    env = np.ones(n, dtype=np.float32)
+    env[:fi] = np.linspace(0.0, 1.0, fi, dtype=np.float32)
+    env[n - fo:] *= np.linspace(1.0, 0.0, fo, dtype=np.float32)
+    sf.write(out_path, data * env[:, None], sr, format="OGG", subtype="VORBIS")
+
+def make_preview(song_dir):
+    meta_path = os.path.join(song_dir, "meta.json")
+    wav_path = os.path.join(song_dir, "song.wav")
+    out_path = os.path.join(song_dir, PREVIEW_FILE)
+
+    y, sr = librosa.load(wav_path, sr=PREVIEW_SR, mono=True)
+    start_s, end_s = find_preview(y, sr)
+    render_clip(wav_path, out_path, start_s, end_s)
+
+    meta = json.load(open(meta_path, encoding="utf-8"))
+    meta["previewFile"] = PREVIEW_FILE
+    meta["previewStartMs"] = int(round(start_s * 1000))
+    meta["previewEndMs"] = int(round(end_s * 1000))
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    print("Saved", out_path, f"{start_s:.1f}s-{end_s:.1f}s", f"({os.path.getsize(out_path)//1024} KB)")
+
+def main(song_dir: str | os.PathLike):
+    """One song folder, or every songs/<artist>/<song> under a library root."""
+    if os.path.exists(os.path.join(song_dir, "song.wav")):
+        make_preview(song_dir)
+        return
+    for artist in sorted(os.listdir(song_dir)):
+        ap = os.path.join(song_dir, artist)
+        if not os.path.isdir(ap):
+            continue
+        for song in sorted(os.listdir(ap)):
+            sp = os.path.join(ap, song)
+            if os.path.exists(os.path.join(sp, "song.wav")):
+                make_preview(sp)
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -0,0 +1,73 @@
+from mythm.engine import (
+    GameSession, EV_HOLD_DONE, STATE_PLAYING, STATE_PAUSE_CD, forwards_lane_key,
+)
+from mythm.notes import Chart, HIT
+
+
+def hold_session():
+    s = GameSession(Chart.from_notes([{"tMs": 1000, "lane": 0, "type": "hold", "durMs": 1000}]))
+    s.step(1000, [(1000, 0, True)])
+    return s
+
+
+def play_to(s, t_from, t_to, frame_ms=1000/60):
+    now = t_from
+    while now <= t_to:
+        s.step(now)
+        now += frame_ms
+
+
+def key(s, state, lane, now, down):
+    """Forward a lane key event the way the runtime does."""
+    if forwards_lane_key(state, down):
+        if down:
+            s.press(lane, now)
+        else:
+            s.release(lane, now)
+
+
+def test_lane_keys_forwarded_by_state():
+    assert forwards_lane_key(STATE_PLAYING, True)
+    assert forwards_lane_key(STATE_PLAYING, False)
+    assert not forwards_lane_key(STATE_PAUSE_CD, True)
+    assert forwards_lane_key(STATE_PAUSE_CD, False)
+    assert not forwards_lane_key("SELECT", False)
+
+
+def test_hold_kept_through_pause_completes():
+    s = hold_session()
+    play_to(s, 1000, 1300)
+    # paused at 1300: frames keep coming but song time is frozen
+    for _ in range(30):
+        s.step(1300)
+    play_to(s, 1300, 2200)
+    assert s.counts == {"PERFECT": 1}
+
+
+def test_hold_released_during_pause_misses():
+    s = hold_session()
+    play_to(s, 1000, 1300)
+    # key let go during the resume countdown, stamped at the frozen song time
+    key(s, STATE_PAUSE_CD, 0, 1300, False)
+    for _ in range(30):
+        s.step(1300)
+    play_to(s, 1300, 2200)
+    assert s.counts == {"MISS": 1}
+    assert all(ev[0] != EV_HOLD_DONE for ev in s.events)
+
+
+def test_press_during_pause_ignored():
+    s = GameSession(Chart.from_notes([{"tMs": 1000, "lane": 0, "type": "tap"}]))
+    key(s, STATE_PAUSE_CD, 0, 1000, True)
+    assert s.counts == {}
+
+
+def test_press_just_outside_great_takes_no_note():
+    # float timestamps: +95.5 ms is past GREAT even though it rounds inside it
+    s = GameSession(Chart.from_notes([{"tMs": 1000, "lane": 0, "type": "tap"}]))
+    s.spawn(1000)
+    assert s.lane_idx.candidate(0, 1095.5) is None
+    assert s.lane_idx.candidate(0, 1095.0) == 0
+    s.step(1095.5, [(1095.5, 0, True)])
+    assert s.counts == {"MISS": 1}      # a stray press, as with no note near
+    assert not s.chart.flags[0] & HIT